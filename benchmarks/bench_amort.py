@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+bench_amort.py
+--------------
+Runtime regression benchmark for the amortization pipeline.
+
+Portfolios are generated deterministically from a seed (card count, APR
+spread, share of fixed minimums) and paired with a budget: "comfortable" is
+three times the first month's minimums, "near_floor" sits just above them.
+Near-floor portfolios use fixed minimums barely above the monthly interest,
+which produces very long tenures. Every scenario times four phases separately,
+as amort_cli runs them:
+
+  load       load_cards_from_csv on a generated CSV
+  plan       plan_multi_card_with_max
+  summarize  generate_summary
+  export     per-card CSVs, monthly CSV and the Excel workbook
+
+Results (median/min seconds per phase, months and schedule rows) are
+written as JSON. Every run is compared against the reference baseline
+committed next to this script (amort_baseline.json, or --baseline) and fails
+when a phase is slower than the baseline by more than --tolerance and
+--min-delta. Baseline times are first scaled by a fixed calibration workload
+timed on both machines, so the committed file is usable on other hardware.
+Refresh it with --out after an intended performance change.
+
+    python benchmarks/bench_amort.py --quick
+    python benchmarks/bench_amort.py --out benchmarks/amort_baseline.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harspylib.amort.amort_allocator import (  # noqa: E402
+    generate_summary, load_cards_from_csv, plan_multi_card_with_max,
+)
+from harspylib.amort.amort_engine import CardArrays, month_terms  # noqa: E402
+from harspylib.amort.amort_result import PlanResult  # noqa: E402
+
+# name -> (cards, APR low, APR high, budget mode)
+SCENARIOS = {
+    "small_comfortable": (5, 12.0, 25.0, "comfortable"),
+    "small_near_floor": (5, 12.0, 25.0, "near_floor"),
+    "wide_apr_spread": (50, 0.0, 35.0, "comfortable"),
+    "many_cards": (500, 10.0, 30.0, "comfortable"),
+    "many_near_floor": (100, 10.0, 30.0, "near_floor"),
+}
+QUICK = ["small_comfortable", "small_near_floor", "wide_apr_spread"]
+PHASES = ["load", "plan", "summarize", "export"]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "amort_baseline.json")
+
+
+def make_portfolio(n_cards, apr_low, apr_high, mode="comfortable", seed=0):
+    """
+    Deterministic card table with the CSV columns load_cards_from_csv expects.
+    In "near_floor" mode every card has a fixed minimum 5-30% above its
+    first month's interest.
+    """
+    rng = np.random.default_rng(seed)
+    balance = np.round(rng.lognormal(8.0, 0.8, n_cards), 2)
+    apr = np.round(rng.uniform(apr_low, apr_high, n_cards), 2)
+    if mode == "near_floor":
+        fixed = np.ones(n_cards, dtype=bool)
+        override = np.ceil(balance * apr / 1200 * rng.uniform(1.05, 1.3, n_cards))
+    else:
+        fixed = rng.random(n_cards) < 0.3
+        override = np.round(rng.uniform(30, 150, n_cards), 0)
+    return pd.DataFrame({
+        "Card": [f"Card{i:04d}" for i in range(n_cards)],
+        "Balance": balance,
+        "APR": apr,
+        "Min_Override": np.where(fixed, override, np.nan),
+        "Min_Pct": np.where(fixed, np.nan, np.round(rng.uniform(1.0, 3.0, n_cards), 2)),
+    })
+
+
+def budget_for(cards, mode):
+    """Monthly budget relative to the first month's total minimum payments."""
+    arrays = CardArrays.from_cards(cards)
+    _, _, base, _ = month_terms(arrays.balance, arrays.monthly_rate, arrays.min_override, arrays.min_pct)
+    return round(float(base.sum()) * (3.0 if mode == "comfortable" else 1.02), 2)
+
+
+def export(schedules, monthly_summary, outdir):
+    for name, df in schedules.items():
+        df.to_csv(os.path.join(outdir, f"{name}_schedule.csv"), index=False)
+    monthly_summary.to_csv(os.path.join(outdir, "monthly_allocation.csv"), index=False)
+    PlanResult.from_schedules(schedules).to_excel(os.path.join(outdir, "bench-schedules.xlsx"))
+
+
+def calibrate(repeat=5):
+    """Median seconds of a fixed pandas/numpy workload, used to compare machine speed."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"k": rng.integers(0, 100, 200_000), "v": rng.random(200_000)})
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        df.groupby("k")["v"].sum()
+        np.sort(df["v"].to_numpy())
+        df.head(20_000).to_csv(os.devnull, index=False)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def run_scenario(n_cards, apr_low, apr_high, mode, repeat, seed):
+    times = {phase: [] for phase in PHASES}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "cards.csv")
+        make_portfolio(n_cards, apr_low, apr_high, mode, seed).to_csv(csv_path, index=False)
+        for run in range(repeat + 1):   # run 0 warms up imports and caches, untimed
+            t0 = time.perf_counter()
+            cards = load_cards_from_csv(csv_path)
+            t1 = time.perf_counter()
+            schedules, monthly_summary = plan_multi_card_with_max(cards, budget_for(cards, mode))
+            t2 = time.perf_counter()
+            generate_summary(schedules)
+            t3 = time.perf_counter()
+            export(schedules, monthly_summary, tmp)
+            t4 = time.perf_counter()
+            if run:
+                for phase, seconds in zip(PHASES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3)):
+                    times[phase].append(seconds)
+
+    result = {phase: {"median_seconds": statistics.median(ts), "min_seconds": min(ts)}
+              for phase, ts in times.items()}
+    result["months"] = int(len(monthly_summary))
+    result["rows"] = int(sum(len(df) for df in schedules.values()))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runtime regression benchmark for the amortization pipeline")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario")
+    parser.add_argument("--seed", type=int, default=0, help="Portfolio generator seed")
+    parser.add_argument("--quick", action="store_true", help="Only the small scenarios")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="Run only this scenario (repeatable)")
+    parser.add_argument("--out", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="JSON result to compare against (default: the committed amort_baseline.json)")
+    parser.add_argument("--no-baseline", action="store_true", help="Only measure, do not compare")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed slowdown vs baseline as a fraction (default: 0.5 = 50%%)")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="Slowdowns smaller than this many seconds never fail (default: 0.005)")
+    args = parser.parse_args()
+
+    names = args.scenario or (QUICK if args.quick else list(SCENARIOS))
+    baseline = {}
+    if not args.no_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        elif args.baseline != DEFAULT_BASELINE:
+            parser.error(f"baseline not found: {args.baseline}")
+
+    calibration = calibrate()
+    base_calibration = baseline.get("_machine", {}).get("calibration_seconds")
+    scale = calibration / base_calibration if base_calibration else 1.0
+    if baseline:
+        print(f"Machine speed vs baseline: {1 / scale:.2f}x (baseline times scaled by {scale:.2f})")
+
+    results = {"_machine": {"calibration_seconds": calibration}}
+    failed = False
+    for name in names:
+        res = results[name] = run_scenario(*SCENARIOS[name], repeat=args.repeat, seed=args.seed)
+        print(f"{name:<18} {res['months']:6d} months {res['rows']:8d} rows")
+        for phase in PHASES:
+            seconds = res[phase]["median_seconds"]
+            line = f"  {phase:<10} {seconds * 1000:10.1f} ms"
+            base = baseline.get(name, {}).get(phase)
+            if base:
+                expected = base["median_seconds"] * scale
+                ratio = seconds / expected if expected else 1.0
+                line += f"  ({ratio:.2f}x baseline)"
+                if seconds > expected * (1 + args.tolerance) and seconds - expected > args.min_delta:
+                    failed = True
+                    line += "  ❌ slower than baseline"
+            print(line)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
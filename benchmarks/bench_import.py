@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+bench_import.py
+---------------
+Import-time regression benchmark for harspylib.
+
+Each scenario is imported in a fresh interpreter several times. The script
+records the median wall time and checks that heavy optional front-end
+dependencies (gradio, streamlit, selenium, plotly) were not loaded where
+they should not be. Results are written as JSON; with --baseline the run
+fails when a scenario is slower than the baseline by more than --tolerance,
+or when a forbidden module shows up.
+
+    python benchmarks/bench_import.py --out import_times.json
+    python benchmarks/bench_import.py --baseline benchmarks/import_baseline.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY = ["gradio", "streamlit", "selenium", "plotly"]
+
+# name -> (statement, modules that must not be imported by it)
+SCENARIOS = {
+    "harspylib": ("import harspylib", HEAVY + ["pandas", "numpy"]),
+    "amort_allocator": ("from harspylib.amort import plan_multi_card_with_max", HEAVY),
+    "amort_cli": ("from harspylib.amort import amort_cli", HEAVY),
+    "htmlscraper": ("from harspylib.htmlscraper import process_html", HEAVY),
+    "xlink_static": ("from harspylib.xlinkscraper import fetch_many, SiteCrawler, HTTPCache, extract_links_auto",
+                     HEAVY),
+}
+
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {watch!r} if m in sys.modules]}}))
+"""
+
+
+def run_scenario(stmt, watch, repeat):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    times, loaded = [], set()
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(stmt=stmt, watch=watch)],
+                             capture_output=True, text=True, env=env, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(result["seconds"])
+        loaded.update(result["loaded"])
+    return {"median_seconds": statistics.median(times), "min_seconds": min(times),
+            "forbidden_loaded": sorted(loaded)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time regression benchmark for harspylib")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per scenario")
+    parser.add_argument("--out", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed slowdown vs baseline as a fraction (default: 0.5 = 50%%)")
+    args = parser.parse_args()
+
+    results = {name: run_scenario(stmt, watch, args.repeat) for name, (stmt, watch) in SCENARIOS.items()}
+    failed = False
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    for name, res in results.items():
+        line = f"{name:<16} {res['median_seconds'] * 1000:8.1f} ms"
+        if res["forbidden_loaded"]:
+            failed = True
+            line += f"  ❌ loaded {', '.join(res['forbidden_loaded'])}"
+        if name in baseline:
+            limit = baseline[name]["median_seconds"] * (1 + args.tolerance)
+            if res["median_seconds"] > limit:
+                failed = True
+                line += f"  ❌ slower than baseline ({baseline[name]['median_seconds'] * 1000:.1f} ms)"
+        print(line)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
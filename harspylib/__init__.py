@@ -5,11 +5,25 @@ A collection of Python utilities:
 - Amortization calculator
 - HTML link scraper (local)
 - XPath link scraper (web, static + dynamic)
+
+Submodules are imported lazily on first attribute access, so
+`import harspylib` stays cheap and does not pull in gradio, streamlit,
+selenium or plotly until a module that needs them is used.
 """
+import importlib
 
 __version__ = "0.1.0"
 
-# Optionally expose submodules directly
-from . import amort
-from . import htmlscraper
-from . import xlinkscraper
+__all__ = ["amort", "htmlscraper", "xlinkscraper"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
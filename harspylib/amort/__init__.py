@@ -4,8 +4,72 @@ harspylib.amort
 Amortization utilities:
 - CLI, Streamlit, Gradio interfaces
 - Loan repayment schedule calculations
+
+Submodules and the allocator API load lazily on first attribute access.
+The core planner (amort_allocator, amort_engine) only needs pandas/numpy;
+the Gradio and Streamlit front-ends are imported only when touched.
 """
-from . import amort_allocator
-from . import amort_cli
-from . import amort_gradio
-from . import amort_streamlit
+import importlib
+
+_SUBMODULES = [
+    "amort_allocator",
+    "amort_engine",
+    "amort_events",
+    "amort_stream",
+    "amort_result",
+    "amort_cache",
+    "amort_replan",
+    "amort_strategy",
+    "amort_montecarlo",
+    "amort_profile",
+    "amort_sweep",
+    "amort_batch",
+    "amort_server",
+    "amort_cli",
+    "amort_gradio",
+    "amort_streamlit",
+]
+
+# Public names re-exported from submodules: name -> submodule
+_ATTRS = {
+    "SimpleCard": "amort_allocator",
+    "load_cards_from_csv": "amort_allocator",
+    "load_cards": "amort_allocator",
+    "load_card_arrays": "amort_allocator",
+    "LoadReport": "amort_allocator",
+    "plan_multi_card_with_max": "amort_allocator",
+    "generate_summary": "amort_allocator",
+    "plan_multi_card_events": "amort_events",
+    "iter_schedule": "amort_stream",
+    "stream_plan": "amort_stream",
+    "PlanResult": "amort_result",
+    "compare_strategies": "amort_strategy",
+    "ScenarioPlan": "amort_replan",
+    "simulate_paths": "amort_montecarlo",
+    "Profiler": "amort_profile",
+    "profiling": "amort_profile",
+    "PlanChange": "amort_replan",
+    "PlanCache": "amort_cache",
+    "cached_plan": "amort_cache",
+    "sweep_budgets": "amort_sweep",
+    "solve_min_budget": "amort_sweep",
+    "run_batch": "amort_batch",
+    "PlanServer": "amort_server",
+}
+
+__all__ = _SUBMODULES + list(_ATTRS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    elif name in _ATTRS:
+        value = getattr(importlib.import_module(f".{_ATTRS[name]}", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,6 +1,8 @@
 import pandas as pd
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Optional
+from .amort_engine import CardArrays, plan_multi_card_vectorized
+from .amort_profile import count, timed
 
 @dataclass
 class SimpleCard:
@@ -10,22 +12,116 @@ class SimpleCard:
     min_override: Optional[float] = 0.0  # fixed minimum payment
     min_pct: Optional[float] = None       # percentage of balance, e.g., 2% as 0.02
 
-def load_cards_from_csv(path: str):
-    df = pd.read_csv(path)
-    cards = []
-    for _, row in df.iterrows():
-        try:
-            min_override = float(row["Min_Override"]) if "Min_Override" in row and not pd.isna(row["Min_Override"]) else 0.0
-            min_pct = float(row["Min_Pct"])/100 if "Min_Pct" in row and not pd.isna(row["Min_Pct"]) else None
-            cards.append(SimpleCard(
-                name=str(row["Card"]),
-                balance=float(row["Balance"]),
-                apr_percent=float(row["APR"]),
-                min_override=min_override,
-                min_pct=min_pct
-            ))
-        except Exception as e:
-            print(f"Skipping row due to error: {e}")
+CARD_COLUMNS = ["Card", "Balance", "APR", "Min_Override", "Min_Pct"]
+
+@dataclass
+class LoadReport:
+    loaded: int
+    rejected: pd.DataFrame  # Row, Card, Reason for every rejected input row
+
+    def messages(self):
+        return [f"row {r.Row}: {r.Reason}" for r in self.rejected.itertuples(index=False)]
+
+def read_card_table(source):
+    """Read card rows from a CSV/Parquet/Feather path, a pandas DataFrame or a pyarrow Table."""
+    if isinstance(source, pd.DataFrame):
+        return source
+    if hasattr(source, "to_pandas"):  # pyarrow Table / RecordBatch
+        return source.to_pandas()
+    path = str(source)
+    ext = path.rsplit(".", 1)[-1].lower() if "." in path else ""
+    if ext in ("parquet", "pq"):
+        return pd.read_parquet(path)
+    if ext in ("feather", "arrow", "ipc"):
+        return pd.read_feather(path)
+    return pd.read_csv(path, usecols=lambda c: c in CARD_COLUMNS)
+
+def _numeric_column(df, name, required, reasons):
+    """Coerce one column to float in bulk, recording a reason for missing/non-numeric values."""
+    if name not in df.columns:
+        if required:
+            reasons.append(pd.Series(f"missing column {name}", index=df.index))
+        return pd.Series(float("nan"), index=df.index)
+    raw = df[name]
+    if raw.dtype == object or pd.api.types.is_string_dtype(raw):
+        raw = raw.astype("string").str.strip().replace("", pd.NA)
+    values = pd.to_numeric(raw, errors="coerce").astype(float)
+    missing = raw.isna()
+    bad = values.isna() & ~missing
+    reasons.append(pd.Series(None, index=df.index, dtype=object)
+                   .mask(bad, f"{name} is not a number")
+                   .mask(missing & required, f"missing {name}"))
+    return values
+
+def validate_card_table(df):
+    """
+    Validate and coerce Card/Balance/APR/Min_Override/Min_Pct in bulk.
+    Returns (clean, rejected): `clean` has columns name, balance, apr_percent,
+    min_override, min_pct (fraction, NaN if unset) for accepted rows; `rejected`
+    lists Row, Card and Reason for the others.
+    """
+    reasons = []
+    if "Card" in df.columns:
+        names = df["Card"].astype(str).where(df["Card"].notna())
+        reasons.append(pd.Series(None, index=df.index, dtype=object).mask(names.isna(), "missing Card"))
+    else:
+        names = pd.Series(None, index=df.index, dtype=object)
+        reasons.append(pd.Series("missing column Card", index=df.index))
+    balance = _numeric_column(df, "Balance", True, reasons)
+    apr = _numeric_column(df, "APR", True, reasons)
+    min_override = _numeric_column(df, "Min_Override", False, reasons).fillna(0.0)
+    min_pct = _numeric_column(df, "Min_Pct", False, reasons) / 100
+
+    # First reason per row wins
+    reason = pd.Series(None, index=df.index, dtype=object)
+    for r in reversed(reasons):
+        reason = r.where(r.notna(), reason)
+    ok = reason.isna().to_numpy()
+
+    clean = pd.DataFrame({
+        "name": names[ok], "balance": balance[ok], "apr_percent": apr[ok],
+        "min_override": min_override[ok], "min_pct": min_pct[ok],
+    })
+    rejected = pd.DataFrame({"Row": df.index[~ok], "Card": names[~ok].to_numpy(),
+                             "Reason": reason[~ok].to_numpy()})
+    return clean, rejected
+
+@timed("load")
+def load_card_arrays(source):
+    """Load straight into column form (CardArrays) without building SimpleCard objects."""
+    clean, rejected = validate_card_table(read_card_table(source))
+    arrays = CardArrays(
+        names=clean["name"].tolist(),
+        balance=clean["balance"].to_numpy(dtype=float),
+        apr_percent=clean["apr_percent"].to_numpy(dtype=float),
+        min_override=clean["min_override"].to_numpy(dtype=float),
+        min_pct=clean["min_pct"].fillna(0.0).to_numpy(dtype=float),
+    )
+    count("cards_loaded", len(clean))
+    count("rows_rejected", len(rejected))
+    return arrays, LoadReport(loaded=len(clean), rejected=rejected)
+
+@timed("load")
+def load_cards(source):
+    """Load SimpleCard objects from a path, DataFrame or Arrow table. Returns (cards, LoadReport)."""
+    clean, rejected = validate_card_table(read_card_table(source))
+    pct = clean["min_pct"].to_numpy()
+    cards = [SimpleCard(name=n, balance=b, apr_percent=a, min_override=o, min_pct=None if p != p else p)
+             for n, b, a, o, p in zip(clean["name"].tolist(), clean["balance"].tolist(),
+                                      clean["apr_percent"].tolist(), clean["min_override"].tolist(),
+                                      pct.tolist())]
+    count("cards_loaded", len(cards))
+    count("rows_rejected", len(rejected))
+    return cards, LoadReport(loaded=len(cards), rejected=rejected)
+
+def load_cards_from_csv(path: str, errors=None):
+    """Load cards from CSV (or Parquet/Feather). Bad rows are skipped; pass a list as `errors` to collect them instead of printing."""
+    cards, report = load_cards(path)
+    for msg in report.messages():
+        if errors is not None:
+            errors.append(msg)
+        else:
+            print(f"Skipping row due to error: {msg}")
     return cards
 
 def compute_monthly_interest(balance, apr_percent):
@@ -39,7 +135,8 @@ def compute_min_due(c: SimpleCard):
         return max(25, c.balance * c.min_pct)
     return max(25, c.balance * 0.02)
 
-def plan_multi_card_with_max(cards, max_allowed):
+@timed("plan")
+def plan_multi_card_with_max(cards, max_allowed, engine="numpy"):
 
     # CODE FIX TWO BELOW
     """
@@ -52,9 +149,20 @@ def plan_multi_card_with_max(cards, max_allowed):
       - budget = max(user max_allowed, baseline)
       - Distribute extra = budget - baseline to cards in APR-desc order (avalanche),
         capping each at (balance + interest).
+
+    engine="numpy" (default) runs the array-backed engine in amort_engine;
+    engine="python" runs the original per-card loop below.
     """
+    if engine == "numpy":
+        schedules, monthly_summary = plan_multi_card_vectorized(cards, max_allowed)
+        count("months_simulated", len(monthly_summary))
+        return schedules, monthly_summary
+    if engine != "python":
+        raise ValueError(f"Unknown engine: {engine}")
+
     eps = 0.01
     schedules = {}
+    cards = [replace(c) for c in cards]  # simulate on copies; callers' balances stay intact
     month_num = 1
     monthly_records = []
     # Work on a live list of cards
@@ -145,9 +253,11 @@ def plan_multi_card_with_max(cards, max_allowed):
             row[name] = month.get(name, {}).get("Actual_Payment", 0.0)
         summary_rows.append(row)
     monthly_summary = pd.DataFrame(summary_rows)
+    count("months_simulated", len(monthly_summary))
 
     return schedules, monthly_summary
 
+@timed("summarize")
 def generate_summary(schedules, start_date=None):
     summary = []
     for name, df in schedules.items():
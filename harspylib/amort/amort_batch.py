@@ -0,0 +1,215 @@
+"""
+amort_batch
+-----------
+Batch portfolio mode: plan many customers' card files in one run.
+
+Jobs come from a directory of card CSVs (one customer per file, named after
+the file) or from a manifest CSV with columns Customer, Cards and Max.
+Jobs are fanned out over a process pool with a bounded number in flight,
+each job is isolated (a failing customer becomes an error row, not a failed
+run), and results are appended to one consolidated summary table keyed by
+Customer plus one job-status table, as CSV or Parquet.
+"""
+import os
+import glob
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .amort_allocator import load_cards_from_csv
+from .amort_events import plan_multi_card_events
+
+SUMMARY_COLUMNS = ["Customer", "Card", "Opening_Balance", "Total_Interest",
+                   "Total_Tenure_Months", "Start_Payment", "End_Payment"]
+STATUS_COLUMNS = ["Customer", "Source", "Max", "Status", "Cards", "Rejected_Rows", "Months", "Error"]
+
+
+@dataclass
+class BatchJob:
+    customer: str
+    path: Any                       # raw Cards value for manifest rows, validated in run_job
+    max_allowed: Any                # raw Max value (or the default budget)
+    base_dir: Optional[str] = None  # manifest directory, for relative card paths
+
+
+def resolve_job(job: BatchJob):
+    """(card file path, budget) for a job; raises ValueError for a bad manifest row."""
+    path = job.path
+    if not isinstance(path, str) or not path.strip():
+        raise ValueError("No card file for this customer")
+    path = path.strip()
+    if job.base_dir and not os.path.isabs(path):
+        path = os.path.join(job.base_dir, path)
+
+    budget = job.max_allowed
+    if budget is None or (not isinstance(budget, str) and pd.isna(budget)):
+        raise ValueError("No max budget for this customer")
+    try:
+        budget = float(budget)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid max budget: {job.max_allowed!r}") from None
+    return path, budget
+
+
+def discover_jobs(source, max_allowed=None):
+    """
+    Build jobs from a directory of card CSVs (all using `max_allowed`) or from a
+    manifest CSV with columns Customer, Cards and optionally Max. Relative card
+    paths in a manifest are resolved against the manifest's directory.
+    """
+    if os.path.isdir(source):
+        if max_allowed is None:
+            raise ValueError("A max budget is required when the batch source is a directory")
+        paths = sorted(glob.glob(os.path.join(source, "*.csv")))
+        return [BatchJob(os.path.splitext(os.path.basename(p))[0], p, float(max_allowed)) for p in paths]
+
+    manifest = pd.read_csv(source)
+    missing = {"Customer", "Cards"} - set(manifest.columns)
+    if missing:
+        raise ValueError(f"Manifest is missing columns: {', '.join(sorted(missing))}")
+    if "Max" not in manifest.columns and max_allowed is None:
+        raise ValueError("Manifest has no Max column and no default max budget was given")
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    jobs = []
+    for row in manifest.itertuples(index=False):
+        budget = getattr(row, "Max", None)
+        if budget is None or (not isinstance(budget, str) and pd.isna(budget)):
+            budget = max_allowed
+        jobs.append(BatchJob(str(row.Customer), row.Cards, budget, base_dir))
+    return jobs
+
+
+def run_job(job: BatchJob):
+    """Plan one customer. Never raises: failures come back as an error status."""
+    # Source/Max hold the validated values only, so the status columns keep one type each
+    status = {"Customer": job.customer, "Source": job.path if isinstance(job.path, str) else "", "Max": None,
+              "Status": "ok", "Cards": 0, "Rejected_Rows": 0, "Months": 0, "Error": ""}
+    try:
+        path, budget = resolve_job(job)
+        status["Source"], status["Max"] = path, budget
+        errors = []
+        cards = load_cards_from_csv(path, errors=errors)
+        status["Rejected_Rows"] = len(errors)
+        if errors:
+            status["Status"] = "partial"
+            status["Error"] = "; ".join(errors)
+        if not cards:
+            raise ValueError("No valid cards found")
+
+        plan = plan_multi_card_events(cards, budget)
+        summary = plan.summary
+        summary.insert(0, "Customer", job.customer)
+        status["Cards"] = len(cards)
+        status["Months"] = plan.months
+        return summary, status
+    except Exception as e:
+        status["Status"] = "error"
+        status["Error"] = "; ".join(filter(None, [status["Error"], f"{type(e).__name__}: {e}"]))
+        return pd.DataFrame(columns=SUMMARY_COLUMNS), status
+
+
+def iter_batch(jobs, processes=None, max_pending=None):
+    """
+    Yield (summary_df, status) per job in completion order. With processes > 1
+    jobs run on a process pool with at most `max_pending` submitted at once,
+    so memory stays bounded however many jobs there are.
+    """
+    if not processes or processes <= 1:
+        for job in jobs:
+            yield run_job(job)
+        return
+
+    max_pending = max_pending or processes * 4
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = set()
+        for job in jobs:
+            pending.add(pool.submit(run_job, job))
+            if len(pending) >= max_pending:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+                nxt = next(jobs, None)
+                if nxt is not None:
+                    pending.add(pool.submit(run_job, nxt))
+
+
+class TableWriter:
+    """Append DataFrames to one CSV or Parquet file, buffering into row groups."""
+
+    def __init__(self, path, columns, rows_per_group=50000):
+        self.path = path
+        self.columns = columns
+        self.rows_per_group = rows_per_group
+        self.parquet = path.endswith(".parquet")
+        self._buffer = []
+        self._buffered = 0
+        self._writer = None
+        self._started = False
+
+    def write(self, df):
+        if df.empty:
+            return
+        self._buffer.append(df.reindex(columns=self.columns))
+        self._buffered += len(df)
+        if self._buffered >= self.rows_per_group:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        chunk = pd.concat(self._buffer, ignore_index=True)
+        self._buffer, self._buffered = [], 0
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            # Mixed date/"Month n" payment columns are stored as text
+            table = pa.Table.from_pandas(chunk.astype({c: str for c in ("Start_Payment", "End_Payment")
+                                                       if c in chunk.columns}), preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            chunk.to_csv(self.path, mode="a" if self._started else "w", header=not self._started, index=False)
+        self._started = True
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+        elif not self._started:
+            # Always leave a file behind, even when every job failed
+            if self.parquet:
+                pd.DataFrame(columns=self.columns).astype(str).to_parquet(self.path, index=False)
+            else:
+                pd.DataFrame(columns=self.columns).to_csv(self.path, index=False)
+
+
+def status_path_for(out_path):
+    root, ext = os.path.splitext(out_path)
+    return f"{root}_status{ext}"
+
+
+def run_batch(jobs, out_path, processes=None, max_pending=None):
+    """
+    Run every job and write the consolidated summary to `out_path` (.csv or
+    .parquet) and the per-job status table next to it. Returns the status table.
+    """
+    summary_writer = TableWriter(out_path, SUMMARY_COLUMNS)
+    statuses = []
+    try:
+        for summary, status in iter_batch(jobs, processes=processes, max_pending=max_pending):
+            summary_writer.write(summary)
+            statuses.append(status)
+    finally:
+        summary_writer.close()
+
+    status_df = pd.DataFrame(statuses, columns=STATUS_COLUMNS)
+    status_writer = TableWriter(status_path_for(out_path), STATUS_COLUMNS)
+    status_writer.write(status_df)
+    status_writer.close()
+    return status_df
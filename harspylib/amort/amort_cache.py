@@ -0,0 +1,256 @@
+"""
+amort_cache
+-----------
+Content-addressed result cache shared by the CLI, Gradio and Streamlit
+front-ends.
+
+Keys are a SHA-256 of the normalized card columns (names, balances, APRs,
+minimum rules) plus the budget and start date, so the same statement
+uploaded twice - under any file name - hits the same entry. Entries live in
+a thread-safe LRU bounded by count and approximate bytes, with an optional
+on-disk tier that survives restarts. The disk tier is data-only: each entry
+is a Feather file of the frame (the long table of a PlanResult, or a summary
+DataFrame) plus a JSON sidecar, so a shared cache directory cannot inject
+code the way unpickling would. It needs pyarrow and is skipped without it.
+Hit/miss counters are exposed through `stats()`.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .amort_engine import CardArrays
+from .amort_result import PlanResult
+
+CACHE_VERSION = "1"   # bump when the planner's output changes
+
+
+def plan_key(cards, max_allowed, start_date=None, kind="plan"):
+    """Hash of the normalized card data plus budget, start date and result kind."""
+    arrays = cards if isinstance(cards, CardArrays) else CardArrays.from_cards(cards)
+    h = hashlib.sha256()
+    h.update(f"{CACHE_VERSION}|{kind}|{float(max_allowed)!r}|{start_date}|".encode())
+    h.update("\x1f".join(arrays.names).encode())
+    for col in (arrays.balance, arrays.apr_percent, arrays.min_override, arrays.min_pct):
+        h.update(np.ascontiguousarray(col, dtype="<f8").tobytes())
+    return h.hexdigest()
+
+
+def _approx_size(value):
+    """Rough in-memory size of a cached value, for byte-bounded eviction."""
+    table = getattr(value, "table", None)
+    if table is not None:
+        return int(table.memory_usage(deep=True).sum())
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _encode(value):
+    """(JSON metadata, DataFrame) for the disk tier, or None for values it does not store."""
+    if isinstance(value, PlanResult):
+        return {"version": CACHE_VERSION, "type": "plan", "names": value.names}, value.table
+    if isinstance(value, pd.DataFrame):
+        return {"version": CACHE_VERSION, "type": "frame"}, value
+    return None
+
+
+def _decode(meta, frame):
+    if meta["type"] == "plan":
+        return PlanResult(frame, meta["names"])
+    if meta["type"] == "frame":
+        return frame
+    raise ValueError(f"Unknown cache entry type {meta['type']!r}")
+
+
+class PlanCache:
+    """Thread-safe LRU cache with an optional on-disk tier."""
+
+    def __init__(self, max_entries=128, max_bytes=256 * 1024 * 1024, disk_dir=None,
+                 max_disk_bytes=1024 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()   # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # ---- Memory tier ----
+    def _put_memory(self, key, value, size):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     (self.max_bytes and self._bytes > self.max_bytes and len(self._entries) > 1)):
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                self._stats["evictions"] += 1
+
+    # ---- Disk tier ----
+    def _disk_paths(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json"), os.path.join(self.disk_dir, f"{key}.feather")
+
+    def _get_disk(self, key):
+        if not self.disk_dir:
+            return None
+        meta_path, frame_path = self._disk_paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != CACHE_VERSION:
+                return None
+            frame = pd.read_feather(frame_path)
+            value = _decode(meta, frame)
+            os.utime(meta_path)  # mark as recently used
+            return value
+        except (OSError, ValueError, KeyError, ImportError):
+            return None
+
+    def _write_atomic(self, path, write):
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _put_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        encoded = _encode(value)
+        if encoded is None:
+            return
+        meta, frame = encoded
+        meta_path, frame_path = self._disk_paths(key)
+
+        def write_meta(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+        try:
+            # Frame first: an entry is only visible once its sidecar exists
+            self._write_atomic(frame_path, lambda path: frame.reset_index(drop=True).to_feather(path))
+            self._write_atomic(meta_path, write_meta)
+        except (OSError, ValueError, ImportError):
+            return
+        self._trim_disk()
+
+    def _trim_disk(self):
+        if not self.max_disk_bytes:
+            return
+        entries = {}   # key -> [last used, bytes]
+        for name in os.listdir(self.disk_dir):
+            key, ext = os.path.splitext(name)
+            if ext not in (".json", ".feather"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.disk_dir, name))
+            except OSError:
+                continue
+            entry = entries.setdefault(key, [0.0, 0])
+            entry[1] += st.st_size
+            if ext == ".json":
+                entry[0] = st.st_mtime
+        total = sum(size for _, size in entries.values())
+        for _, size, key in sorted((used, size, key) for key, (used, size) in entries.items()):
+            if total <= self.max_disk_bytes:
+                break
+            for path in self._disk_paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            with self._lock:
+                self._stats["disk_evictions"] += 1
+
+    # ---- Public API ----
+    def get(self, key):
+        """Cached value or None. Disk hits are promoted to memory."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[0]
+        value = self._get_disk(key)
+        with self._lock:
+            self._stats["disk_hits" if value is not None else "misses"] += 1
+        if value is not None:
+            self._put_memory(key, value, _approx_size(value))
+        return value
+
+    def put(self, key, value):
+        self._put_memory(key, value, _approx_size(value))
+        self._put_disk(key, value)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+        lookups = out["hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = (out["hits"] + out["disk_hits"]) / lookups if lookups else 0.0
+        return out
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """
+    Process-wide cache used by the front-ends. Configure with the
+    AMORT_CACHE_DIR (enables the disk tier), AMORT_CACHE_ENTRIES and
+    AMORT_CACHE_MB environment variables.
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = PlanCache(
+                max_entries=int(os.environ.get("AMORT_CACHE_ENTRIES", 128)),
+                max_bytes=int(float(os.environ.get("AMORT_CACHE_MB", 256)) * 1024 * 1024),
+                disk_dir=os.environ.get("AMORT_CACHE_DIR") or None,
+            )
+        return _default_cache
+
+
+def cached_plan(cards, max_allowed, cache=None):
+    """PlanResult for these cards and budget, computed once per distinct content."""
+    cache = cache or default_cache()
+    arrays = cards if isinstance(cards, CardArrays) else CardArrays.from_cards(cards)
+    key = plan_key(arrays, max_allowed)
+    return cache.get_or_compute(key, lambda: PlanResult.plan(arrays, max_allowed))
+
+
+def cached_summary(cards, max_allowed, start_date=None, cache=None):
+    """Card summary for these cards, budget and start date, computed once per distinct content."""
+    cache = cache or default_cache()
+    arrays = cards if isinstance(cards, CardArrays) else CardArrays.from_cards(cards)
+    key = plan_key(arrays, max_allowed, start_date, kind="summary")
+    return cache.get_or_compute(key, lambda: cached_plan(arrays, max_allowed, cache).summary(start_date))
+
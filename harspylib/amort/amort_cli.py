@@ -1,46 +1,241 @@
 import argparse
 import os
-import pandas as pd
-from .amort_allocator import load_cards_from_csv, plan_multi_card_with_max, generate_summary
+import numpy as np
+from .amort_allocator import load_cards_from_csv, plan_multi_card_with_max
+from .amort_result import PlanResult
+from .amort_cache import PlanCache, cached_plan
+from .amort_replan import ScenarioPlan, parse_change
+from .amort_events import plan_multi_card_events
+from .amort_sweep import sweep_budgets, solve_min_budget
+from .amort_strategy import compare_strategies
+from .amort_montecarlo import MonteCarloModel, simulate_paths
+from .amort_batch import discover_jobs, run_batch, status_path_for
+from .amort_profile import Profiler, count, phase, profiling
 
 def main():
     parser = argparse.ArgumentParser(description="Credit Card Amortization CLI")
-    parser.add_argument("--cards", required=True, help="Path to cards.csv")
-    parser.add_argument("--max", required=True, type=float, help="Max allowed monthly payment")
+    parser.add_argument("--cards", help="Path to cards.csv")
+    parser.add_argument("--max", type=float, help="Max allowed monthly payment")
     parser.add_argument("--outdir", default=".", help="Output directory for CSV/Excel files")
+    parser.add_argument("--engine", choices=["numpy", "python"], default="numpy",
+                        help="Planner engine: vectorized numpy (default) or the per-card python loop")
+    parser.add_argument("--summary-only", action="store_true",
+                        help="Only write summary.csv, using the event-driven planner (no per-month schedules)")
+    parser.add_argument("--sweep", metavar="START:STOP:STEP",
+                        help="Evaluate a range of max budgets in one pass and write budget_sweep.csv")
+    parser.add_argument("--target-months", type=int,
+                        help="Find the smallest max budget that pays everything off within this many months")
+    parser.add_argument("--max-interest", type=float,
+                        help="Find the smallest max budget whose total interest stays within this amount")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Worker processes for --sweep and --batch (default: single process)")
+    parser.add_argument("--batch", metavar="DIR_OR_MANIFEST",
+                        help="Plan every customer in a directory of card CSVs or a manifest CSV (Customer,Cards,Max)")
+    parser.add_argument("--batch-out", default=None,
+                        help="Consolidated batch summary file, .csv or .parquet (default: <outdir>/batch_summary.csv)")
+    parser.add_argument("--long-out", default=None,
+                        help="Also write the long-format schedule table (.parquet or .feather)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Reuse plans for identical card data and budget from this on-disk cache")
+    parser.add_argument("--strategies", metavar="NAME,NAME",
+                        help="Compare payoff strategies (avalanche, snowball, highest_balance) in one pass "
+                             "and write strategy_comparison.csv")
+    parser.add_argument("--monte-carlo", type=int, metavar="PATHS",
+                        help="Simulate this many variable APR/budget paths and write monte_carlo.csv percentiles")
+    parser.add_argument("--apr-vol", type=float, default=0.25,
+                        help="Monte Carlo: std dev of monthly APR index moves, in percentage points (default 0.25)")
+    parser.add_argument("--budget-vol", type=float, default=0.0,
+                        help="Monte Carlo: std dev of the monthly budget as a fraction of --max (default 0)")
+    parser.add_argument("--seed", type=int, default=None, help="Monte Carlo random seed")
+    parser.add_argument("--change", action="append", default=[], metavar="MONTH:KIND:VALUE[:CARD]",
+                        help="Mid-plan change, repeatable: budget, apr or lump_sum from MONTH "
+                             "(e.g. 13:budget:1500, 6:apr:9.9:Visa, 4:lump_sum:2000)")
+    parser.add_argument("--profile", metavar="REPORT.json",
+                        help="Write a JSON report of per-phase timings, counters and peak memory")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="With --profile, also run under cProfile (raw stats next to the report, "
+                             "top functions in it)")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="With --profile, trace Python allocations for per-phase peak memory (slower)")
     args = parser.parse_args()
 
+    if not args.profile:
+        run(args, parser)
+        return
+    profiler = Profiler()
+    cprofile_path = os.path.splitext(args.profile)[0] + ".prof" if args.cprofile else None
+    try:
+        with profiling(profiler, cprofile_path=cprofile_path, trace_memory=args.profile_memory):
+            run(args, parser)
+    finally:
+        profiler.write_json(args.profile)
+        print(f"Profile report: {args.profile}")
+        if cprofile_path:
+            print(f"cProfile stats: {cprofile_path}")
+
+
+def run(args, parser):
+    if args.batch:
+        os.makedirs(args.outdir, exist_ok=True)
+        out_path = args.batch_out or os.path.join(args.outdir, "batch_summary.csv")
+        try:
+            jobs = discover_jobs(args.batch, args.max)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return
+        with phase("batch"):
+            status_df = run_batch(jobs, out_path, processes=args.processes)
+        count("customers", len(status_df))
+        counts = status_df["Status"].value_counts()
+        print(f"\n✅ Batch finished: {len(status_df)} customers "
+              f"({counts.get('ok', 0)} ok, {counts.get('partial', 0)} partial, {counts.get('error', 0)} error)")
+        print(f"Consolidated summary: {out_path}")
+        print(f"Job status: {status_path_for(out_path)}")
+        return
+
+    if not args.cards:
+        parser.error("--cards is required unless --batch is given")
+
+    search = args.target_months is not None or args.max_interest is not None
+    if args.max is None and not (args.sweep or search):
+        parser.error("--max is required unless --sweep, --target-months or --max-interest is given")
+    if args.max is None:
+        # Everything below the sweep/search step plans at --max; don't skip it silently
+        needs_max = [flag for flag, value in (("--monte-carlo", args.monte_carlo), ("--strategies", args.strategies),
+                                              ("--change", args.change), ("--long-out", args.long_out))
+                     if value]
+        if needs_max:
+            parser.error(f"--max is required with {', '.join(needs_max)}")
+    if args.monte_carlo is not None and args.monte_carlo < 1:
+        parser.error("--monte-carlo needs at least 1 path")
+    if args.sweep:
+        try:
+            start, stop, step = (float(v) for v in args.sweep.split(":"))
+        except ValueError:
+            parser.error("--sweep expects START:STOP:STEP, e.g. 500:3000:100")
+        if not step > 0:
+            parser.error("--sweep STEP must be greater than 0")
+        if not stop >= start:
+            parser.error("--sweep STOP must not be below START")
+
     if not os.path.exists(args.cards):
         print(f"Error: CSV file not found: {args.cards}")
         return
 
     os.makedirs(args.outdir, exist_ok=True)
-    excel_prefix = args.cards.split(".csv")[0]
+    excel_prefix = os.path.splitext(os.path.basename(args.cards))[0]
     cards = load_cards_from_csv(args.cards)
     if not cards:
         print("No valid cards found in CSV.")
         return
 
-    # Compute schedules
-    schedules, monthly_summary = plan_multi_card_with_max(cards, args.max)
+    if args.sweep:
+        budgets = np.arange(start, stop + step / 2, step)
+        with phase("sweep"):
+            sweep_df = sweep_budgets(cards, budgets, processes=args.processes)
+        sweep_csv_path = os.path.join(args.outdir, "budget_sweep.csv")
+        sweep_df.to_csv(sweep_csv_path, index=False)
+        print("\n✅ Budget Sweep:")
+        print(sweep_df.to_string(index=False))
+        print(f"\nBudget sweep CSV: {sweep_csv_path}")
 
-    # Save per-card CSVs
-    for name, df in schedules.items():
-        df.to_csv(os.path.join(args.outdir, f"{name}_schedule.csv"), index=False)
+    if search:
+        with phase("search"):
+            solution = solve_min_budget(cards, target_months=args.target_months, max_interest=args.max_interest)
+        if solution is None:
+            print("\nNo budget can meet the requested target.")
+        else:
+            print(f"\n✅ Smallest budget meeting the target: {solution.budget:.2f} "
+                  f"({solution.months} months, total interest {solution.total_interest:.2f})")
 
-    # Save monthly summary CSV
-    monthly_csv_path = os.path.join(args.outdir, "monthly_allocation.csv")
-    monthly_summary.to_csv(monthly_csv_path, index=False)
+    if args.max is None:
+        return
 
-    # Save Excel workbook
-    excel_path = os.path.join(args.outdir, excel_prefix + "-schedules.xlsx")
-    with pd.ExcelWriter(excel_path) as writer:
-        monthly_summary.to_excel(writer, sheet_name="Summary", index=False)
+    scenario = None
+    if args.change:
+        try:
+            with phase("plan"):
+                scenario = ScenarioPlan(cards, args.max, [parse_change(c) for c in args.change])
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        for month, name, amount in scenario.lump_sums:
+            print(f"Lump sum month {month}: {amount:.2f} to {name}")
+
+    if args.strategies:
+        try:
+            with phase("strategies"):
+                strategies = [name.strip() for name in args.strategies.split(",")]
+                compare_df = compare_strategies(cards, args.max, strategies)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        compare_csv_path = os.path.join(args.outdir, "strategy_comparison.csv")
+        compare_df.to_csv(compare_csv_path, index=False)
+        print("\n✅ Strategy Comparison:")
+        print(compare_df.to_string(index=False))
+        print(f"\nStrategy comparison CSV: {compare_csv_path}")
+
+    if args.monte_carlo:
+        model = MonteCarloModel(apr_vol=args.apr_vol, budget_vol=args.budget_vol)
+        with phase("monte_carlo"):
+            mc = simulate_paths(cards, args.max, n_paths=args.monte_carlo, model=model, seed=args.seed,
+                                processes=args.processes)
+        mc_df = mc.summary()
+        mc_csv_path = os.path.join(args.outdir, "monte_carlo.csv")
+        mc_df.to_csv(mc_csv_path, index=False)
+        print(f"\n✅ Monte Carlo ({args.monte_carlo} paths, {mc.paid_off_rate:.1%} paid off):")
+        print(mc_df.to_string(index=False))
+        print(f"\nMonte Carlo CSV: {mc_csv_path}")
+
+    if args.summary_only:
+        with phase("summarize"):
+            summary = scenario.result().summary() if scenario else plan_multi_card_events(cards, args.max).summary
+        summary_csv_path = os.path.join(args.outdir, "summary.csv")
+        summary.to_csv(summary_csv_path, index=False)
+        print("\n✅ Card Summary:")
+        print(summary.to_string(index=False))
+        print(f"\nSummary CSV: {summary_csv_path}")
+        return
+
+    # Compute schedules (one long table; per-card views derive from it)
+    if scenario is not None:
+        result = scenario.result()
+    elif args.engine == "python":
+        result = PlanResult.from_schedules(plan_multi_card_with_max(cards, args.max, engine="python")[0])
+    elif args.cache_dir:
+        cache = PlanCache(disk_dir=args.cache_dir)
+        result = cached_plan(cards, args.max, cache=cache)
+        print("Plan served from cache." if cache.stats()["disk_hits"] else "Plan computed and cached.")
+    else:
+        result = PlanResult.plan(cards, args.max)
+    schedules = result.schedules
+    monthly_summary = result.monthly_summary
+
+    with phase("export_csv"):
+        # Save per-card CSVs
         for name, df in schedules.items():
-            df.to_excel(writer, sheet_name=name, index=False)
+            df.to_csv(os.path.join(args.outdir, f"{name}_schedule.csv"), index=False)
+            count("rows_written", len(df))
+
+        # Save monthly summary CSV
+        monthly_csv_path = os.path.join(args.outdir, "monthly_allocation.csv")
+        monthly_summary.to_csv(monthly_csv_path, index=False)
+        count("rows_written", len(monthly_summary))
+
+    # Save Excel workbook (streamed row by row)
+    excel_path = os.path.join(args.outdir, excel_prefix + "-schedules.xlsx")
+    result.to_excel(excel_path)
+
+    # Long-format table for analytics
+    if args.long_out:
+        if args.long_out.endswith(".feather"):
+            result.to_feather(args.long_out)
+        else:
+            result.to_parquet(args.long_out)
 
     # Generate and save summary
-    summary_df = generate_summary(schedules)
+    summary_df = result.summary()
     summary_csv_path = os.path.join(args.outdir, "summary.csv")
     summary_df.to_csv(summary_csv_path, index=False)
 
@@ -51,6 +246,8 @@ def main():
     print(f"Excel workbook: {excel_path}")
     print(f"Per-card CSVs saved in: {args.outdir}")
     print(f"Summary CSV: {summary_csv_path}")
+    if args.long_out:
+        print(f"Long-format schedule: {args.long_out}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,308 @@
+"""
+amort_engine
+------------
+Array-backed allocation engine for the multi-card planner.
+
+Cards are stored as columns (balance, APR, min_override, min_pct) and every
+month's interest, minimum dues, caps and avalanche extra are computed as
+batched NumPy operations over the cards that still carry a balance.
+The allocation rules are the ones documented in
+`amort_allocator.plan_multi_card_with_max`.
+"""
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import List, Optional
+
+EPS = 0.01               # balances at or below this are treated as paid off
+MIN_FLOOR = 25.0         # every minimum due is at least this much
+DEFAULT_MIN_PCT = 0.02   # fallback percentage minimum when none is given
+EXTRA_TOL = 1e-9         # extra budget below this is not distributed
+MAX_MONTHS = 12000       # guard against plans that never pay off (e.g. minimum below interest)
+
+SCHEDULE_COLUMNS = ["Month", "Card", "Curr_Bal", "Interest", "Min_Due",
+                    "Actual_Payment", "New_Bal", "Highest_APR"]
+
+
+@dataclass
+class CardArrays:
+    """Column-oriented view of a list of SimpleCard objects."""
+    names: List[str]
+    balance: np.ndarray
+    apr_percent: np.ndarray
+    min_override: np.ndarray   # 0.0 where the card has no fixed minimum
+    min_pct: np.ndarray        # 0.0 where the card has no percentage minimum
+
+    @classmethod
+    def from_cards(cls, cards):
+        return cls(
+            names=[c.name for c in cards],
+            balance=np.array([float(c.balance) for c in cards], dtype=float),
+            apr_percent=np.array([float(c.apr_percent) for c in cards], dtype=float),
+            min_override=np.array([float(c.min_override or 0.0) for c in cards], dtype=float),
+            min_pct=np.array([float(c.min_pct or 0.0) for c in cards], dtype=float),
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def monthly_rate(self):
+        return self.apr_percent / 100 / 12
+
+    def avalanche_order(self):
+        """Card indices by APR descending; ties keep their input order."""
+        return np.argsort(-self.apr_percent, kind="stable")
+
+
+def round2(values):
+    """
+    Round to cents exactly like Python's round(x, 2).
+    np.round scales by 100 first, which can flip values sitting on a half-cent,
+    so those few entries are re-rounded with the builtin.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        rounded[near_half] = [round(float(v), 2) for v in values[near_half]]
+    return rounded
+
+
+def effective_min_pct(min_pct):
+    """Percentage used for the minimum due: the card's own, else the 2% fallback."""
+    return np.where(min_pct > 0, min_pct, DEFAULT_MIN_PCT)
+
+
+def month_terms(balance, rate, min_override, min_pct):
+    """
+    Per-card interest, minimum due, base payment and payoff cap for one month.
+    Fixed minimums are paid as-is; percentage minimums are paid on top of interest.
+    """
+    interest = balance * rate
+    has_override = min_override > 0
+    pct_min = balance * effective_min_pct(min_pct)
+    min_due = np.maximum(MIN_FLOOR, np.where(has_override, min_override, pct_min))
+    base = np.where(has_override, min_due, min_due + interest)
+    cap = np.maximum(0.0, balance + interest)
+    base = np.minimum(base, cap)
+    return interest, min_due, base, cap
+
+
+def allocate_month(balance, rate, min_override, min_pct, max_allowed):
+    """
+    Allocate one month across cards that are already in avalanche order.
+    Returns (interest, min_due, payment) arrays aligned with the inputs.
+    """
+    interest, min_due, base, cap = month_terms(balance, rate, min_override, min_pct)
+
+    # Budget is raised to at least the sum of the bases; the rest is extra
+    baseline = base.sum()
+    extra = max(float(max_allowed), baseline) - baseline
+
+    # Avalanche: extra left for card i is what the cards before it could not absorb
+    room = np.maximum(cap - base, 0.0)
+    left = extra - (np.cumsum(room) - room)
+    add = np.where(left > EXTRA_TOL, np.minimum(left, room), 0.0)
+    return interest, min_due, base + add
+
+
+@dataclass
+class MonthBlock:
+    """One simulated month; arrays are aligned with `idx`, the active cards in avalanche order."""
+    month: int
+    idx: np.ndarray
+    curr_bal: np.ndarray
+    interest: np.ndarray
+    min_due: np.ndarray
+    payment: np.ndarray
+    new_bal: np.ndarray
+
+
+def iter_months(arrays: CardArrays, max_allowed, balance=None, start_month=1):
+    """
+    Simulate month by month without touching the source cards, yielding one
+    MonthBlock per month as soon as it is computed. `balance` and
+    `start_month` resume from a checkpoint instead of the opening balances.
+    """
+    balance = np.array(arrays.balance if balance is None else balance, dtype=float)
+    rate = arrays.monthly_rate
+    order = arrays.avalanche_order()
+    active = order[balance[order] > EPS]
+    month = start_month
+
+    while active.size:
+        curr = balance[active]
+        interest, min_due, payment = allocate_month(
+            curr, rate[active], arrays.min_override[active], arrays.min_pct[active], max_allowed
+        )
+        new_bal = curr + interest - payment
+        yield MonthBlock(month, active, curr, interest, min_due, payment, new_bal)
+
+        balance[active] = new_bal
+        active = active[new_bal > EPS]
+        month += 1
+
+
+def long_columns(blocks, names):
+    """
+    Concatenate month blocks into rounded schedule columns (SCHEDULE_COLUMNS,
+    one entry per card per month). Also returns the card index of each entry.
+    """
+    sizes = [b.idx.size for b in blocks]
+    idx_col = np.concatenate([b.idx for b in blocks])
+    highest = np.zeros(idx_col.size, dtype=bool)
+    highest[np.cumsum([0] + sizes[:-1])] = True   # first card of every month has the highest APR
+    cols = {
+        "Month": np.repeat(np.array([b.month for b in blocks], dtype=np.int64), sizes),
+        "Card": np.asarray(names, dtype=object)[idx_col],
+        "Curr_Bal": round2(np.concatenate([b.curr_bal for b in blocks])),
+        "Interest": round2(np.concatenate([b.interest for b in blocks])),
+        "Min_Due": round2(np.concatenate([b.min_due for b in blocks])),
+        "Actual_Payment": round2(np.concatenate([b.payment for b in blocks])),
+        "New_Bal": round2(np.maximum(np.concatenate([b.new_bal for b in blocks]), 0.0)),
+        "Highest_APR": highest,
+    }
+    return cols, idx_col
+
+
+def wide_columns(blocks, names):
+    """Monthly allocation columns (Month + one payment column per card, 0.0 when inactive)."""
+    cols, idx_col = long_columns(blocks, names)
+    first = blocks[0].month
+    grid = np.zeros((blocks[-1].month - first + 1, len(names)))
+    grid[cols["Month"] - first, idx_col] = cols["Actual_Payment"]
+    wide = {"Month": np.arange(first, blocks[-1].month + 1)}
+    for j, name in enumerate(names):
+        wide[name] = grid[:, j]
+    return wide
+
+
+class MemorySink:
+    """
+    In-memory consumer of the month stream. close() assembles the classic
+    (schedules, monthly_summary) pair returned by plan_multi_card_with_max.
+    """
+
+    def open(self, names):
+        self.names = list(names)
+        self.blocks = []
+
+    def write(self, block: MonthBlock):
+        self.blocks.append(block)
+
+    def close(self):
+        schedules = {}
+        if not self.blocks:
+            for name in self.names:
+                schedules[name] = pd.DataFrame([])
+            return schedules, pd.DataFrame([])
+
+        # ---- Per-card schedules: stable sort by card keeps months ascending ----
+        cols, idx_col = long_columns(self.blocks, self.names)
+        by_card = np.argsort(idx_col, kind="stable")
+        bounds = np.searchsorted(idx_col[by_card], np.arange(len(self.names) + 1))
+        for j, name in enumerate(self.names):
+            rows = by_card[bounds[j]:bounds[j + 1]]
+            if rows.size == 0:
+                schedules[name] = pd.DataFrame([])
+                continue
+            data = {k: v[rows] for k, v in cols.items()}
+            data["Card"] = [name] * rows.size
+            schedules[name] = pd.DataFrame(data, columns=SCHEDULE_COLUMNS)
+
+        # ---- Monthly allocation summary (same columns every month) ----
+        monthly_summary = pd.DataFrame(wide_columns(self.blocks, self.names))
+        return schedules, monthly_summary
+
+
+def plan_multi_card_vectorized(cards, max_allowed):
+    """
+    Vectorized equivalent of plan_multi_card_with_max.
+    Returns (schedules, monthly_summary) with the same layout.
+    """
+    arrays = CardArrays.from_cards(cards)
+    sink = MemorySink()
+    sink.open(arrays.names)
+    for block in iter_months(arrays, max_allowed):
+        sink.write(block)
+    return sink.close()
+
+
+@dataclass
+class BatchResult:
+    """Outcome of simulate_batch; per-card arrays are (plans, cards) in input card order."""
+    months: np.ndarray          # months until every card is paid off (max_months if unfinished)
+    interest: np.ndarray        # total interest per plan and card
+    paid: np.ndarray            # total payments per plan and card
+    payoff_month: np.ndarray    # month each card is paid off (0 if it never had a balance)
+    finished: np.ndarray        # False where the plan was still running after max_months
+
+
+def simulate_batch(arrays: CardArrays, max_allowed, order: Optional[np.ndarray] = None,
+                   max_months=MAX_MONTHS):
+    """
+    Run many plans over the same cards in one pass, one row per plan.
+    `max_allowed` is a scalar or one budget per plan; `order` is the payoff
+    priority, shape (cards,) or (plans, cards), defaulting to avalanche.
+    Only totals are kept, no per-month rows. Plans still running after
+    `max_months` (e.g. a minimum below the interest) stop there and are
+    flagged in `finished`.
+    """
+    budgets = np.atleast_1d(np.asarray(max_allowed, dtype=float))
+    n_cards = len(arrays)
+    if order is None:
+        order = arrays.avalanche_order()
+    order = np.asarray(order)
+    n_plans = max(budgets.size, order.shape[0] if order.ndim == 2 else 1)
+    budgets = np.broadcast_to(budgets, (n_plans,))
+    order = np.broadcast_to(order, (n_plans, n_cards))
+
+    # Columns permuted into each plan's priority order
+    balance = arrays.balance[order]
+    rate = arrays.monthly_rate[order]
+    min_override = arrays.min_override[order]
+    min_pct = arrays.min_pct[order]
+
+    interest_total = np.zeros((n_plans, n_cards))
+    paid_total = np.zeros((n_plans, n_cards))
+    payoff = np.zeros((n_plans, n_cards), dtype=np.int64)
+    active = balance > EPS
+    live = np.flatnonzero(active.any(axis=1))
+    month = 0
+
+    while live.size and month < max_months:
+        month += 1
+        act = active[live]
+        bal = np.where(act, balance[live], 0.0)
+        interest, _, base, cap = month_terms(bal, rate[live], min_override[live], min_pct[live])
+        interest = np.where(act, interest, 0.0)
+        base = np.where(act, base, 0.0)
+        cap = np.where(act, cap, 0.0)
+
+        baseline = base.sum(axis=1)
+        extra = np.maximum(budgets[live], baseline) - baseline
+        room = np.maximum(cap - base, 0.0)
+        left = extra[:, None] - (np.cumsum(room, axis=1) - room)
+        payment = base + np.where(left > EXTRA_TOL, np.minimum(left, room), 0.0)
+        new_bal = bal + interest - payment
+
+        balance[live] = np.where(act, new_bal, balance[live])
+        interest_total[live] += interest
+        paid_total[live] += payment
+        done = act & (new_bal <= EPS)
+        payoff[live] = np.where(done, month, payoff[live])
+        active[live] = act & ~done
+        live = live[active[live].any(axis=1)]
+
+    # Undo the per-plan priority permutation
+    result = []
+    for values in (interest_total, paid_total, payoff):
+        out = np.empty_like(values)
+        np.put_along_axis(out, order, values, axis=1)
+        result.append(out)
+    finished = ~active.any(axis=1)
+    months = np.where(finished, payoff.max(axis=1, initial=0), month)
+    return BatchResult(months=months, interest=result[0], paid=result[1],
+                       payoff_month=result[2], finished=finished)
@@ -0,0 +1,205 @@
+"""
+amort_events
+------------
+Event-driven planner that skips straight to the next month where the
+allocation pattern changes.
+
+Between events every card follows an affine recurrence:
+  - fixed minimum      -> new = (1 + r) * bal - max(25, min_override)
+  - percentage minimum -> new = (1 - pct) * bal        (while pct * bal > 25)
+  - 25 floor           -> new = bal - 25
+  - avalanche target   -> new = (1 + r) * bal - (budget - other bases)
+so a whole stretch of months is one matrix power applied to the balances
+(plus running interest totals). An "event" is any month that breaks that
+pattern: a card paying off, the 25 floor taking over from the percentage
+minimum, or the budget starting to exceed the sum of the minimums.
+Event months are simulated exactly with amort_engine.allocate_month.
+"""
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Optional
+
+from .amort_engine import (
+    CardArrays, EPS, EXTRA_TOL, MAX_MONTHS, MIN_FLOOR,
+    allocate_month, effective_min_pct, month_terms, plan_multi_card_vectorized,
+)
+
+OVERRIDE, PCT, FLOOR = 0, 1, 2
+
+
+@dataclass
+class EventPlan:
+    summary: pd.DataFrame                          # same columns as generate_summary
+    events: pd.DataFrame                           # Month, Card, Event
+    months: int                                    # total months simulated
+    schedules: Optional[dict] = None               # only when materialize=True
+    monthly_summary: Optional[pd.DataFrame] = None
+
+
+def _kinds(balance, min_override, pct):
+    """Which minimum rule applies to each card at these balances."""
+    return np.where(min_override > 0, OVERRIDE, np.where(balance * pct > MIN_FLOOR, PCT, FLOOR))
+
+
+def _is_plain(balance, rate, min_override, min_pct, pct, max_allowed, kinds, extra_mode):
+    """True when this month follows the segment's affine pattern (no event)."""
+    if not np.all(np.isfinite(balance)):
+        return False
+    if not np.array_equal(_kinds(balance, min_override, pct), kinds):
+        return False
+    interest, _, base, cap = month_terms(balance, rate, min_override, min_pct)
+    if not np.all(base < cap):
+        return False
+    baseline = base.sum()
+    extra = max(float(max_allowed), baseline) - baseline
+    if (extra > EXTRA_TOL) != extra_mode:
+        return False
+    payment = base.copy()
+    if extra_mode:
+        if extra >= cap[0] - base[0]:
+            return False
+        payment[0] += extra
+    return bool(np.all(balance + interest - payment > EPS))
+
+
+def _segment_matrix(rate, min_override, pct, max_allowed, kinds, extra_mode):
+    """
+    Affine month map on the state [balances, interest totals, 1] for cards in
+    avalanche order. Card 0 absorbs the extra when extra_mode is set.
+    """
+    n = rate.size
+    const = 2 * n
+    idx = np.arange(n)
+    fixed = np.maximum(MIN_FLOOR, min_override)
+
+    is_ovr, is_pct = kinds == OVERRIDE, kinds == PCT
+    diag = np.where(is_ovr, 1 + rate, np.where(is_pct, 1 - pct, 1.0))
+    shift = np.where(is_ovr, -fixed, np.where(is_pct, 0.0, -MIN_FLOOR))
+    # base payment = base_b * balance + base_c
+    base_b = np.where(is_ovr, 0.0, np.where(is_pct, pct + rate, rate))
+    base_c = np.where(is_ovr, fixed, np.where(is_pct, 0.0, MIN_FLOOR))
+
+    M = np.zeros((const + 1, const + 1))
+    M[idx, idx] = diag
+    M[idx, const] = shift
+    M[n + idx, n + idx] = 1.0
+    M[n + idx, idx] = rate
+    M[const, const] = 1.0
+
+    if extra_mode:
+        # Target pays whatever the budget leaves after the other cards' bases
+        M[0, :] = 0.0
+        M[0, 0] = 1 + rate[0]
+        M[0, 1:n] = base_b[1:]
+        M[0, const] = base_c[1:].sum() - float(max_allowed)
+    return M
+
+
+def _jump(M, state, ok, limit):
+    """Largest k <= limit such that ok(M^k @ state); returns (k, M^k @ state)."""
+    powers = []
+    P, step = M, 1
+    while step <= limit:
+        if not ok(P @ state):
+            break
+        powers.append(P)
+        P, step = P @ P, step * 2
+
+    k = 0
+    for i in reversed(range(len(powers))):
+        if k + (1 << i) > limit:
+            continue
+        candidate = powers[i] @ state
+        if ok(candidate):
+            state, k = candidate, k + (1 << i)
+    return k, state
+
+
+def plan_multi_card_events(cards, max_allowed, start_date=None, materialize=False, max_months=MAX_MONTHS):
+    """
+    Plan with the allocation rules of plan_multi_card_with_max, jumping over
+    months where nothing changes. Returns an EventPlan with the per-card
+    summary and the list of events; per-month schedules are only built when
+    materialize=True.
+
+    Total_Interest is summed from unrounded monthly interest, so it can differ
+    by a few cents from generate_summary, which sums the rounded schedule rows.
+    """
+    arrays = CardArrays.from_cards(cards)
+    n_cards = len(arrays)
+    rate = arrays.monthly_rate
+    pct = effective_min_pct(arrays.min_pct)
+
+    balance = arrays.balance.copy()
+    order = arrays.avalanche_order()
+    active = order[balance[order] > EPS]
+    started = active.copy()
+    interest_total = np.zeros(n_cards)
+    last_month = np.zeros(n_cards, dtype=np.int64)
+    prev_kinds = np.full(n_cards, -1)
+    events = []
+    month = 1
+
+    while active.size:
+        if month > max_months:
+            raise ValueError(f"Plan does not pay off within {max_months} months")
+
+        # ---- Note minimum-floor takeovers ----
+        b = balance[active]
+        ovr, mp, pc, r = arrays.min_override[active], arrays.min_pct[active], pct[active], rate[active]
+        kinds = _kinds(b, ovr, pc)
+        for j in active[(prev_kinds[active] == PCT) & (kinds == FLOOR)]:
+            events.append({"Month": month, "Card": arrays.names[j], "Event": "min_floor"})
+        prev_kinds[active] = kinds
+
+        # ---- Jump over months that follow the current pattern ----
+        _, _, base, _ = month_terms(b, r, ovr, mp)
+        extra_mode = bool(max(float(max_allowed), base.sum()) - base.sum() > EXTRA_TOL)
+        if _is_plain(b, r, ovr, mp, pc, max_allowed, kinds, extra_mode):
+            n = active.size
+            M = _segment_matrix(r, ovr, pc, max_allowed, kinds, extra_mode)
+            state = np.concatenate([b, np.zeros(n), [1.0]])
+            ok = lambda s: _is_plain(s[:n], r, ovr, mp, pc, max_allowed, kinds, extra_mode)  # noqa: E731
+            k, state = _jump(M, state, ok, max_months - month)
+            if k:
+                balance[active] = state[:n]
+                interest_total[active] += state[n:2 * n]
+                month += k
+
+        # ---- Simulate the event month exactly ----
+        b = balance[active]
+        interest, _, payment = allocate_month(b, r, ovr, mp, max_allowed)
+        new_bal = b + interest - payment
+        interest_total[active] += interest
+        balance[active] = new_bal
+
+        paid = new_bal <= EPS
+        for j in active[paid]:
+            last_month[j] = month
+            events.append({"Month": month, "Card": arrays.names[j], "Event": "paid_off"})
+        active = active[~paid]
+        month += 1
+
+    # ---- Per-card summary (input order, cards with a balance only) ----
+    summary = []
+    start = pd.to_datetime(start_date) if start_date is not None else None
+    for j in sorted(started):
+        end = int(last_month[j])
+        summary.append({
+            "Card": arrays.names[j],
+            "Opening_Balance": round(float(arrays.balance[j]), 2),
+            "Total_Interest": round(float(interest_total[j]), 2),
+            "Total_Tenure_Months": end,
+            "Start_Payment": start if start is not None else "Month 1",
+            "End_Payment": start + pd.DateOffset(months=end - 1) if start is not None else f"Month {end}",
+        })
+
+    plan = EventPlan(
+        summary=pd.DataFrame(summary),
+        events=pd.DataFrame(events, columns=["Month", "Card", "Event"]),
+        months=month - 1,
+    )
+    if materialize:
+        plan.schedules, plan.monthly_summary = plan_multi_card_vectorized(cards, max_allowed)
+    return plan
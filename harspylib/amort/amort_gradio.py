@@ -1,98 +1,92 @@
 import gradio as gr
-import pandas as pd
-import tempfile, os
+import numpy as np
+import os
+import shutil
+import tempfile
 import plotly.express as px
-from .amort_allocator import load_cards_from_csv, plan_multi_card_with_max, generate_summary
-from typing import Any
-
-# --- Cache previous inputs/outputs ---
-if "prev_inputs" not in globals():
-    prev_inputs: dict[str, Any] = {
-        "file_path": None,
-        "max_allowed": None,
-        "schedules": None,
-        "monthly": None,
-        "monthly_csv": None,
-        "excel_path": None,
-        "summary_df": None,
-        "summary_csv": None,
-        "fig": None
-    }
-
-def compute_from_csv(file_path, max_allowed):
-    global prev_inputs
-
+from .amort_allocator import load_cards_from_csv
+from .amort_cache import cached_plan
+
+# Planning jobs run on at most WORKERS threads; at most QUEUE_SIZE wait behind them
+WORKERS = int(os.environ.get("AMORT_GRADIO_WORKERS", 4))
+QUEUE_SIZE = int(os.environ.get("AMORT_GRADIO_QUEUE", 64))
+MAX_CHART_POINTS = 400   # months plotted per card, plus payoff corners
+
+
+def downsample_balances(balances, max_points=MAX_CHART_POINTS):
+    """
+    Thin a Month x card balance table to about `max_points` evenly spaced
+    months. The first and last month and every card's payoff month (and the
+    month before it) are always kept, so the corners of each line survive.
+    """
+    n = len(balances)
+    if n <= max_points:
+        return balances
+    keep = np.zeros(n, dtype=bool)
+    keep[np.linspace(0, n - 1, max_points).round().astype(int)] = True
+    values = balances.to_numpy()
+    paid = (values <= 0) & np.vstack([np.ones((1, values.shape[1]), dtype=bool), values[:-1] > 0])
+    payoff_rows = np.flatnonzero(paid.any(axis=1))
+    keep[payoff_rows] = True
+    keep[np.maximum(payoff_rows - 1, 0)] = True
+    return balances[keep]
+
+
+def _clear_session(session):
+    """Remove a session's export files (State delete callback and before each new run)."""
+    if session and session.get("dir"):
+        shutil.rmtree(session["dir"], ignore_errors=True)
+
+
+def compute_from_csv(file_path, max_allowed, session=None):
     if file_path is None:
-        return "Upload CSV", None, None, None, None, None, None
-
-    # Recompute only if file or max_allowed changed
-    recompute = (prev_inputs["file_path"] != file_path) or (prev_inputs["max_allowed"] != max_allowed)
-
-    if not recompute and prev_inputs["schedules"] is not None:
-        return ("Schedules already computed!",
-                prev_inputs["monthly"],
-                prev_inputs["monthly_csv"],
-                prev_inputs["excel_path"],
-                prev_inputs["fig"],
-                prev_inputs["summary_df"],
-                prev_inputs["summary_csv"])
+        return "Upload CSV", None, None, None, None, None, None, session
 
     # Load cards
     cards = load_cards_from_csv(file_path)
     if not cards:
-        return "No valid cards found", None, None, None, None, None, None
-
-    # Compute schedules
-    schedules, monthly = plan_multi_card_with_max(cards, float(max_allowed))
-
-    # Temporary directory for outputs
-    tmpdir = tempfile.mkdtemp()
-    monthly_csv = os.path.join(tmpdir, "monthly_allocation.csv")
-    excel_prefix = file_path.split(".csv")[0]
-    excel_path = os.path.join(tmpdir, excel_prefix + "-schedules.xlsx")
+        return "No valid cards found", None, None, None, None, None, None, session
+
+    # Plans are shared through the content-addressed cache; files are per session
+    result = cached_plan(cards, float(max_allowed))
+    monthly = result.monthly_summary
+    summary_df = result.summary()
+
+    # Each session writes into its own directory, replaced on every run
+    _clear_session(session)
+    session = {"dir": tempfile.mkdtemp(prefix="amort-gradio-")}
+    outdir = session["dir"]
+    monthly_csv = os.path.join(outdir, "monthly_allocation.csv")
     monthly.to_csv(monthly_csv, index=False)
 
     # Excel workbook with per-card sheets
-    with pd.ExcelWriter(excel_path) as writer:
-        monthly.to_excel(writer, sheet_name="Summary", index=False)
-        for name, df in schedules.items():
-            df.to_excel(writer, sheet_name=name, index=False)
-
-    # Generate summary
-    summary_df = generate_summary(schedules)
-    summary_csv = os.path.join(tmpdir, "summary.csv")
+    excel_prefix = os.path.splitext(os.path.basename(file_path))[0]
+    excel_path = os.path.join(outdir, excel_prefix + "-schedules.xlsx")
+    result.to_excel(excel_path)
+
+    summary_csv = os.path.join(outdir, "summary.csv")
     summary_df.to_csv(summary_csv, index=False)
 
-    # Interactive balance chart using Plotly
-    valid_schedules = {name: df for name, df in schedules.items() if "New_Bal" in df.columns}
-    all_months = sorted({month for df in valid_schedules.values() for month in df["Month"]})
-    aligned_balances = {name: df.set_index("Month").reindex(all_months)["New_Bal"].fillna(0)
-                        for name, df in valid_schedules.items()}
-    balances_df = pd.DataFrame(aligned_balances)
-    balances_df.index.name = "Month"
-    balances_df_reset = balances_df.reset_index().melt(id_vars="Month", var_name="Card", value_name="Balance")
-    fig = px.line(balances_df_reset, x="Month", y="Balance", color="Card", markers=True,
+    # Interactive balance chart using Plotly, decimated server-side
+    balances = result.balances()
+    chart = downsample_balances(balances)
+    balances_df_reset = chart.reset_index().melt(id_vars="Month", var_name="Card", value_name="Balance")
+    fig = px.line(balances_df_reset, x="Month", y="Balance", color="Card", markers=len(chart) <= 60,
                   title="Remaining Balances Over Time")
 
-    # Cache results
-    prev_inputs.update({
-        "file_path": file_path,
-        "max_allowed": max_allowed,
-        "schedules": schedules,
-        "monthly": monthly,
-        "monthly_csv": monthly_csv,
-        "excel_path": excel_path,
-        "summary_df": summary_df,
-        "summary_csv": summary_csv,
-        "fig": fig
-    })
-
-    return "Schedules computed!", monthly, monthly_csv, excel_path, fig, summary_df, summary_csv
+    status = "Schedules computed!"
+    if len(chart) < len(balances):
+        status += f" (chart shows {len(chart)} of {len(balances)} months)"
+    return status, monthly, monthly_csv, excel_path, fig, summary_df, summary_csv, session
 
 # --- Gradio Interface ---
-with gr.Blocks() as demo:
+# delete_cache: drop served copies of export files older than an hour, checked hourly
+with gr.Blocks(delete_cache=(3600, 3600)) as demo:
     gr.Markdown("## 💳 Credit Card Amortization Tool (Interactive)")
 
+    # Per-session export directory, removed when the session ends
+    session_state = gr.State(None, time_to_live=3600, delete_callback=_clear_session)
+
     file_in = gr.File(label="Upload cards.csv", type="filepath")
     max_allowed = gr.Number(label="Max Allowed Monthly Payment", value=1000)
     compute_btn = gr.Button("Compute")
@@ -109,9 +103,13 @@ with gr.Blocks() as demo:
     # Compute schedules only on button click
     compute_btn.click(
         fn=compute_from_csv,
-        inputs=[file_in, max_allowed],
-        outputs=[status, monthly_table, monthly_csv_file, excel_file, balance_chart, summary_table, summary_csv_file]
+        inputs=[file_in, max_allowed, session_state],
+        outputs=[status, monthly_table, monthly_csv_file, excel_file, balance_chart, summary_table,
+                 summary_csv_file, session_state],
+        concurrency_limit=WORKERS,
     )
 
+demo.queue(max_size=QUEUE_SIZE, default_concurrency_limit=WORKERS)
+
 if __name__ == "__main__":
     demo.launch()
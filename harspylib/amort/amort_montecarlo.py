@@ -0,0 +1,157 @@
+"""
+amort_montecarlo
+----------------
+Monte Carlo risk view of the multi-card plan under variable APRs and
+budgets.
+
+Each path follows the allocation rules of plan_multi_card_with_max month by
+month, but with
+  - APRs of variable-rate cards moving with a random-walk index
+    (drift/volatility in percentage points per month, floored), with the
+    avalanche order re-ranked on the current APRs every month, and
+  - the monthly budget drawn around `max_allowed` (normal, floored at zero;
+    budgets below the minimums are raised to them as usual).
+
+All paths of a chunk advance together as one (paths x cards) array step.
+Chunks draw from child streams of one seeded SeedSequence, so results are
+reproducible for a given seed and chunk_size however many processes run
+them. Only per-path totals are kept, never the per-month schedules.
+"""
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .amort_engine import CardArrays, EPS, EXTRA_TOL, MAX_MONTHS, month_terms
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass
+class MonteCarloModel:
+    apr_drift: float = 0.0                 # mean monthly index change, percentage points
+    apr_vol: float = 0.25                  # std dev of monthly index changes, percentage points
+    apr_floor: float = 0.0                 # APRs never fall below this
+    variable: Optional[List[str]] = None   # cards tracking the index (None: all cards)
+    budget_vol: float = 0.0                # std dev of the monthly budget, as a fraction of max_allowed
+
+
+@dataclass
+class MonteCarloResult:
+    """Per-path totals; card arrays are (paths, cards) in input card order."""
+    months: np.ndarray          # months until every card is paid off (max_months if unfinished)
+    interest: np.ndarray        # total interest per path
+    paid: np.ndarray            # total payments per path
+    finished: np.ndarray        # False where the path was still running after max_months
+    payoff_month: np.ndarray    # month each card is paid off (0 if never, or never had a balance)
+    names: List[str]
+
+    def summary(self, percentiles=PERCENTILES):
+        """Mean and percentiles of tenure, total interest and total paid, one row per metric."""
+        metrics = {"Months": self.months, "Total_Interest": self.interest, "Total_Paid": self.paid}
+        rows = []
+        for metric, values in metrics.items():
+            row = {"Metric": metric, "Mean": round(float(values.mean()), 2)}
+            for p, v in zip(percentiles, np.percentile(values, percentiles)):
+                row[f"P{p}"] = round(float(v), 2)
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def card_summary(self, percentiles=PERCENTILES):
+        """Percentiles of each card's payoff month."""
+        values = np.percentile(self.payoff_month, percentiles, axis=0)
+        df = pd.DataFrame(values.T, columns=[f"P{p}" for p in percentiles])
+        df.insert(0, "Card", self.names)
+        return df
+
+    @property
+    def paid_off_rate(self):
+        return float(self.finished.mean()) if self.finished.size else 0.0
+
+
+def _simulate_chunk(arrays, max_allowed, model, seed, n_paths, max_months):
+    rng = np.random.default_rng(seed)
+    n_cards = len(arrays)
+    variable = (np.ones(n_cards, dtype=bool) if model.variable is None
+                else np.isin(arrays.names, model.variable))
+
+    balance = np.tile(arrays.balance, (n_paths, 1))
+    index = np.zeros(n_paths)
+    interest_total = np.zeros(n_paths)
+    paid_total = np.zeros(n_paths)
+    payoff = np.zeros((n_paths, n_cards), dtype=np.int64)
+    active = balance > EPS
+    live = np.flatnonzero(active.any(axis=1))
+    month = 0
+
+    while live.size and month < max_months:
+        month += 1
+        # Draw for every path so each path's stream does not depend on the others
+        index += rng.normal(model.apr_drift, model.apr_vol, n_paths) if model.apr_vol else model.apr_drift
+        budget = float(max_allowed) * (np.maximum(rng.normal(1.0, model.budget_vol, n_paths), 0.0)
+                                       if model.budget_vol else np.ones(n_paths))
+
+        apr = np.maximum(arrays.apr_percent + np.where(variable, index[live, None], 0.0), model.apr_floor)
+        order = np.argsort(-apr, axis=1, kind="stable")
+        act = np.take_along_axis(active[live], order, axis=1)
+        bal = np.where(act, np.take_along_axis(balance[live], order, axis=1), 0.0)
+        rate = np.take_along_axis(apr, order, axis=1) / 100 / 12
+        interest, _, base, cap = month_terms(bal, rate, arrays.min_override[order], arrays.min_pct[order])
+        interest = np.where(act, interest, 0.0)
+        base = np.where(act, base, 0.0)
+        cap = np.where(act, cap, 0.0)
+
+        baseline = base.sum(axis=1)
+        extra = np.maximum(budget[live], baseline) - baseline
+        room = np.maximum(cap - base, 0.0)
+        left = extra[:, None] - (np.cumsum(room, axis=1) - room)
+        payment = base + np.where(left > EXTRA_TOL, np.minimum(left, room), 0.0)
+        new_bal = bal + interest - payment
+
+        interest_total[live] += interest.sum(axis=1)
+        paid_total[live] += payment.sum(axis=1)
+        done = act & (new_bal <= EPS)
+        for values, target in ((np.where(act, new_bal, bal), balance),
+                               (np.where(done, month, np.take_along_axis(payoff[live], order, axis=1)), payoff),
+                               (act & ~done, active)):
+            out = np.empty_like(values)
+            np.put_along_axis(out, order, values, axis=1)
+            target[live] = out
+        live = live[active[live].any(axis=1)]
+
+    finished = ~active.any(axis=1)
+    months = np.where(finished, payoff.max(axis=1, initial=0), month)
+    return months, interest_total, paid_total, finished, payoff
+
+
+def simulate_paths(cards, max_allowed, n_paths=10000, model: Optional[MonteCarloModel] = None, seed=None,
+                   processes=None, chunk_size=5000, max_months=MAX_MONTHS):
+    """
+    Simulate `n_paths` APR/budget paths and return a MonteCarloResult.
+    processes > 1 spreads the chunks over a process pool; the result is the
+    same for a given seed and chunk_size either way.
+    """
+    if n_paths < 1:
+        raise ValueError(f"n_paths must be at least 1, got {n_paths}")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    arrays = cards if isinstance(cards, CardArrays) else CardArrays.from_cards(cards)
+    model = model or MonteCarloModel()
+    if model.variable is not None:
+        unknown = set(model.variable) - set(arrays.names)
+        if unknown:
+            raise ValueError(f"Unknown variable-rate cards: {', '.join(sorted(unknown))}")
+
+    sizes = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(arrays, max_allowed, model, s, n, max_months) for s, n in zip(seeds, sizes)]
+
+    if processes and processes > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        parts = [_simulate_chunk(*a) for a in args]
+
+    months, interest, paid, finished, payoff = (np.concatenate([p[i] for p in parts]) for i in range(5))
+    return MonteCarloResult(months, interest, paid, finished, payoff, arrays.names)
@@ -0,0 +1,182 @@
+"""
+amort_profile
+-------------
+Lightweight instrumentation for the amortization pipeline.
+
+Library code marks its hot paths with `phase("plan")` blocks (or the
+`@timed("plan")` decorator) and `count("months_simulated", n)` calls. All
+are no-ops (one global lookup) unless a Profiler has been activated with
+`profiling(...)`, in which case
+the profiler accumulates per-phase wall time and call counts, counters, and
+peak memory (process max RSS, plus the traced Python peak per phase when
+tracemalloc is running), and forwards every event to its hooks:
+
+    hook(event, name, value)   # event is "phase" (value = seconds) or "count"
+
+A phase re-entered under the same name (e.g. the CLI's "plan" around
+plan_multi_card_with_max's own) is timed once. Traced peaks nest: a phase's
+peak includes the peaks of the phases opened inside it.
+"""
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import pstats
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+_active = None
+_NULL = contextlib.nullcontext()
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024   # bytes on macOS, KiB elsewhere
+
+
+class Profiler:
+    """Collects phase timings, counters and peak memory; see module docstring."""
+
+    def __init__(self, hooks=None):
+        self.hooks = list(hooks or [])
+        self.phases = {}     # name -> {"seconds", "calls", "peak_traced_mb"}
+        self.counters = {}
+        self._open = set()
+        self._peaks = []     # traced peak so far (bytes) of each open phase, innermost last
+        self._started = time.perf_counter()
+        self.cprofile_stats = None
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def _emit(self, event, name, value):
+        for hook in self.hooks:
+            hook(event, name, value)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if name in self._open:
+            yield
+            return
+        self._open.add(name)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            self._push_peak()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - t0
+            self._open.discard(name)
+            stats = self.phases.setdefault(name, {"seconds": 0.0, "calls": 0, "peak_traced_mb": None})
+            stats["seconds"] += seconds
+            stats["calls"] += 1
+            if tracing:
+                peak = self._pop_peak() / (1024 * 1024)
+                stats["peak_traced_mb"] = max(stats["peak_traced_mb"] or 0.0, peak)
+            self._emit("phase", name, seconds)
+
+    def _push_peak(self):
+        # Credit the traced peak so far to the enclosing phase before the
+        # global peak is reset for the new one
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._peaks.append(0)
+
+    def _pop_peak(self):
+        peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        return peak
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+        self._emit("count", name, n)
+
+    def report(self, top=25):
+        """JSON-serializable summary of everything collected so far."""
+        out = {
+            "total_seconds": time.perf_counter() - self._started,
+            "phases": {name: dict(stats) for name, stats in self.phases.items()},
+            "counters": dict(self.counters),
+            "peak_rss_mb": _max_rss_mb(),
+        }
+        if self.cprofile_stats is not None:
+            buf = io.StringIO()
+            pstats.Stats(self.cprofile_stats, stream=buf).sort_stats("cumulative").print_stats(top)
+            out["cprofile_top"] = buf.getvalue().splitlines()
+        return out
+
+    def write_json(self, path, top=25):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(top), f, indent=2)
+        return path
+
+
+@contextlib.contextmanager
+def profiling(profiler=None, cprofile_path=None, trace_memory=False):
+    """
+    Activate `profiler` (a new Profiler by default) for the duration of the
+    block. With cprofile_path the block also runs under cProfile and the raw
+    stats are dumped there; trace_memory turns on tracemalloc for per-phase
+    Python allocation peaks (slower).
+    """
+    global _active
+    profiler = profiler or Profiler()
+    previous, _active = _active, profiler
+    prof = cProfile.Profile() if cprofile_path else None
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if prof is not None:
+        prof.enable()
+    try:
+        yield profiler
+    finally:
+        if prof is not None:
+            prof.disable()
+            prof.dump_stats(cprofile_path)
+            profiler.cprofile_stats = prof
+        if started_tracing:
+            tracemalloc.stop()
+        _active = previous
+
+
+def get_profiler():
+    """The active Profiler, or None."""
+    return _active
+
+
+def phase(name):
+    """Time a block under `name` on the active profiler; a shared no-op context when none is active."""
+    return _active.phase(name) if _active is not None else _NULL
+
+
+def count(name, n=1):
+    """Add `n` to counter `name` on the active profiler, if any."""
+    if _active is not None:
+        _active.count(name, n)
+
+
+def timed(name):
+    """Decorator: run the function inside phase(name) when a profiler is active."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return fn(*args, **kwargs)
+            with _active.phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,167 @@
+"""
+amort_replan
+------------
+Incremental re-planning and mid-plan changes.
+
+A ScenarioPlan keeps every simulated month (amort_engine.MonthBlock), and
+those blocks double as per-month checkpoints of the unrounded balances.
+A what-if query ("raise the budget from month 13", "Visa drops to 9.9% in
+month 6", "pay 2000 off MasterCard in month 4") shares every month before
+its earliest change with the original plan and simulates only the suffix,
+starting from the checkpoint.
+
+Changes (PlanChange) take effect at the start of their month:
+  - "budget"   -> new max_allowed from this month on
+  - "apr"      -> new APR (percent) for one card from this month on; the
+                  avalanche order is re-ranked
+  - "lump_sum" -> one-off payment taken off the balance before the month's
+                  interest, to one card or in avalanche order when no card
+                  is given. Schedules show the reduced Curr_Bal; the amounts
+                  applied are listed in `lump_sums`.
+"""
+import copy
+import numpy as np
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import Optional
+
+from .amort_engine import CardArrays, EPS, MAX_MONTHS, iter_months
+from .amort_result import PlanResult
+
+CHANGE_KINDS = ("budget", "apr", "lump_sum")
+
+
+@dataclass
+class PlanChange:
+    month: int                    # first month the change applies to (1-based)
+    kind: str                     # "budget", "apr" or "lump_sum"
+    value: float                  # new budget, new APR percent, or lump-sum amount
+    card: Optional[str] = None    # card name; required for "apr"
+
+
+def parse_change(text):
+    """PlanChange from "MONTH:KIND:VALUE[:CARD]", e.g. "13:budget:1500" or "4:lump_sum:2000:Visa"."""
+    parts = text.split(":", 3)
+    if len(parts) < 3:
+        raise ValueError(f"Expected MONTH:KIND:VALUE[:CARD], got {text!r}")
+    return PlanChange(month=int(parts[0]), kind=parts[1], value=float(parts[2]),
+                      card=parts[3] if len(parts) == 4 else None)
+
+
+def _check_changes(changes, names):
+    for ch in changes:
+        if ch.kind not in CHANGE_KINDS:
+            raise ValueError(f"Unknown change kind: {ch.kind} (expected one of {', '.join(CHANGE_KINDS)})")
+        if ch.month < 1:
+            raise ValueError(f"Change months start at 1, got {ch.month}")
+        if ch.card is not None and ch.card not in names:
+            raise ValueError(f"Unknown card: {ch.card}")
+        if ch.kind == "apr" and ch.card is None:
+            raise ValueError("An APR change needs a card")
+        if ch.value < 0:
+            raise ValueError(f"Negative value in {ch.kind} change: {ch.value}")
+
+
+class ScenarioPlan:
+    """Avalanche plan with mid-plan changes whose months serve as checkpoints for what-if queries."""
+
+    def __init__(self, cards, max_allowed, changes=(), max_months=MAX_MONTHS):
+        self.arrays = cards if isinstance(cards, CardArrays) else CardArrays.from_cards(cards)
+        self.max_allowed = float(max_allowed)
+        self.max_months = max_months
+        _check_changes(changes, self.arrays.names)
+        self.changes = sorted(changes, key=lambda ch: ch.month)   # stable: later entries win
+        self.blocks = []
+        self.lump_sums = []   # (month, card, amount actually applied)
+        self.finished = self._run(1, self.arrays.balance)
+
+    @property
+    def names(self):
+        return self.arrays.names
+
+    @property
+    def months(self):
+        return len(self.blocks)
+
+    @property
+    def total_interest(self):
+        return round(float(sum(b.interest.sum() for b in self.blocks)), 2)
+
+    @property
+    def total_paid(self):
+        paid = sum(b.payment.sum() for b in self.blocks) + sum(amount for _, _, amount in self.lump_sums)
+        return round(float(paid), 2)
+
+    # ---- Simulation ----
+    def _params(self, month):
+        """Budget and APR column in effect during `month`."""
+        budget, apr = self.max_allowed, self.arrays.apr_percent
+        for ch in self.changes:
+            if ch.month > month:
+                break
+            if ch.kind == "budget":
+                budget = float(ch.value)
+            elif ch.kind == "apr":
+                apr = apr.copy()
+                apr[self.names.index(ch.card)] = ch.value
+        return budget, apr
+
+    def _apply_lump_sums(self, month, balance, arrays):
+        for ch in self.changes:
+            if ch.month != month or ch.kind != "lump_sum":
+                continue
+            if ch.card is not None:
+                targets = np.array([self.names.index(ch.card)])
+            else:
+                targets = arrays.avalanche_order()
+            room = np.where(balance[targets] > EPS, balance[targets], 0.0)
+            take = np.clip(ch.value - (np.cumsum(room) - room), 0.0, room)
+            balance[targets] -= take
+            for i in targets[take > 0]:
+                self.lump_sums.append((month, self.names[i], float(take[targets == i][0])))
+
+    def _run(self, month, balance):
+        """Simulate from the start of `month`; returns True when every card is paid off."""
+        balance = np.array(balance, dtype=float)
+        stops = sorted({ch.month for ch in self.changes if month < ch.month <= self.max_months})
+        for stop in stops + [self.max_months + 1]:
+            budget, apr = self._params(month)
+            arrays = replace(self.arrays, apr_percent=apr)
+            self._apply_lump_sums(month, balance, arrays)
+            for block in islice(iter_months(arrays, budget, balance, month), max(stop - month, 0)):
+                self.blocks.append(block)
+                balance[block.idx] = block.new_bal
+            if not np.any(balance > EPS):
+                return True
+            month = stop
+        return False
+
+    # ---- Checkpoints and what-if ----
+    def checkpoint(self, month):
+        """Unrounded balances at the start of `month`, before that month's changes."""
+        if month <= 1 or not self.blocks:
+            return self.arrays.balance.copy()
+        block = self.blocks[min(month, len(self.blocks) + 1) - 2]
+        balance = np.zeros(len(self.names))
+        balance[block.idx] = block.new_bal
+        return balance
+
+    def what_if(self, *changes):
+        """
+        New plan with `changes` added to this one's. Months before the earliest
+        new change are shared with this plan; only the rest is simulated.
+        """
+        if not changes:
+            return self
+        _check_changes(changes, self.names)
+        start = min(min(ch.month for ch in changes), len(self.blocks) + 1)
+        other = copy.copy(self)
+        other.changes = sorted(self.changes + list(changes), key=lambda ch: ch.month)
+        other.blocks = self.blocks[:start - 1]
+        other.lump_sums = [entry for entry in self.lump_sums if entry[0] < start]
+        other.finished = other._run(start, self.checkpoint(start))
+        return other
+
+    def result(self):
+        """Schedules and summaries as a PlanResult."""
+        return PlanResult.from_blocks(self.blocks, self.names)
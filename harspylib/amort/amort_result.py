@@ -0,0 +1,180 @@
+"""
+amort_result
+------------
+PlanResult: plan output backed by one tidy long-format table, one row per
+card per month (SCHEDULE_COLUMNS, with Card as a categorical in input card
+order). Per-card schedules, the monthly allocation pivot and the card
+summary are derived from it with vectorized groupby/pivot, and the table
+exports directly to Parquet/Feather or to an Excel workbook written in
+xlsxwriter's constant-memory (row-streaming) mode.
+"""
+import numpy as np
+import pandas as pd
+
+from .amort_engine import CardArrays, SCHEDULE_COLUMNS, iter_months, long_columns
+from .amort_profile import count, timed
+
+SUMMARY_COLUMNS = ["Card", "Opening_Balance", "Total_Interest", "Total_Tenure_Months",
+                   "Start_Payment", "End_Payment"]
+
+
+def add_months(start, months):
+    """Vectorized `start + pd.DateOffset(months=m)` for an array of month offsets."""
+    start = pd.Timestamp(start)
+    total = start.month - 1 + np.asarray(months, dtype=np.int64)
+    first = pd.to_datetime(pd.DataFrame({"year": start.year + total // 12, "month": total % 12 + 1, "day": 1}))
+    day = np.minimum(start.day, first.dt.days_in_month.to_numpy())
+    return first + pd.to_timedelta(day - 1, unit="D") + (start - start.normalize())
+
+
+class PlanResult:
+    """Plan output backed by a single long-format table."""
+
+    def __init__(self, table: pd.DataFrame, names):
+        self.table = table
+        self.names = list(names)
+
+    @classmethod
+    @timed("plan")
+    def plan(cls, cards, max_allowed):
+        """Run the planner and keep its output as one long table."""
+        arrays = cards if isinstance(cards, CardArrays) else CardArrays.from_cards(cards)
+        blocks = list(iter_months(arrays, max_allowed))
+        count("months_simulated", len(blocks))
+        return cls.from_blocks(blocks, arrays.names)
+
+    @classmethod
+    def from_blocks(cls, blocks, names):
+        """Build the long table from simulated MonthBlocks."""
+        if blocks:
+            cols, _ = long_columns(blocks, names)
+            table = pd.DataFrame(cols, columns=SCHEDULE_COLUMNS)
+        else:
+            table = pd.DataFrame(columns=SCHEDULE_COLUMNS)
+        table["Card"] = pd.Categorical(table["Card"], categories=list(dict.fromkeys(names)))
+        return cls(table, names)
+
+    @classmethod
+    def from_schedules(cls, schedules):
+        """Wrap an existing dict of per-card schedules."""
+        frames = [df for df in schedules.values() if not df.empty]
+        table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=SCHEDULE_COLUMNS)
+        table = table.sort_values("Month", kind="stable", ignore_index=True)
+        table["Card"] = pd.Categorical(table["Card"], categories=list(dict.fromkeys(schedules)))
+        return cls(table, list(schedules))
+
+    # ---- Derived views ----
+    @property
+    def months(self):
+        return int(self.table["Month"].max()) if len(self.table) else 0
+
+    @property
+    def schedules(self):
+        """Per-card DataFrames keyed by card name, as plan_multi_card_with_max returns."""
+        groups = {name: df for name, df in self.table.groupby("Card", observed=True, sort=False)}
+        out = {}
+        for name in self.names:
+            df = groups.get(name)
+            if df is None:
+                out[name] = pd.DataFrame([])
+            else:
+                df = df.reset_index(drop=True)
+                df["Card"] = df["Card"].astype(str)
+                out[name] = df
+        return out
+
+    @property
+    def monthly_summary(self):
+        """Monthly allocation: Month + one payment column per card (0.0 when inactive)."""
+        if not len(self.table):
+            return pd.DataFrame([])
+        wide = self.table.pivot(index="Month", columns="Card", values="Actual_Payment")
+        wide = wide.reindex(index=np.arange(1, self.months + 1), columns=list(dict.fromkeys(self.names)))
+        wide = wide.fillna(0.0)
+        wide.columns = [str(c) for c in wide.columns]
+        return wide.rename_axis(None, axis=1).reset_index()
+
+    def balances(self):
+        """Remaining balance per card by month (Month index, one column per card, 0.0 once paid off)."""
+        if not len(self.table):
+            return pd.DataFrame([])
+        wide = self.table.pivot(index="Month", columns="Card", values="New_Bal")
+        wide = wide.reindex(index=np.arange(1, self.months + 1),
+                            columns=[n for n in dict.fromkeys(self.names) if n in wide.columns])
+        wide = wide.fillna(0.0)
+        wide.columns = [str(c) for c in wide.columns]
+        return wide.rename_axis(None, axis=1).rename_axis("Month")
+
+    def with_dates(self, start_date):
+        """Long table with a Date column (start_date + Month - 1 months)."""
+        table = self.table.copy()
+        table["Date"] = add_months(start_date, table["Month"].to_numpy() - 1).to_numpy()
+        return table
+
+    @timed("summarize")
+    def summary(self, start_date=None):
+        """Per-card summary with the columns of generate_summary, via one groupby."""
+        if not len(self.table):
+            return pd.DataFrame([])
+        g = self.table.groupby("Card", observed=True, sort=False)
+        agg = pd.DataFrame({
+            "Opening_Balance": g["Curr_Bal"].first().round(2),
+            "Total_Interest": g["Interest"].sum().round(2),
+            "Total_Tenure_Months": g["Month"].max(),
+            "first": g["Month"].first(),
+            "last": g["Month"].last(),
+        })
+        agg = agg.reindex([n for n in dict.fromkeys(self.names) if n in agg.index])
+        if start_date is not None:
+            agg["Start_Payment"] = add_months(start_date, agg["first"].to_numpy() - 1).to_numpy()
+            agg["End_Payment"] = add_months(start_date, agg["last"].to_numpy() - 1).to_numpy()
+        else:
+            agg["Start_Payment"] = "Month " + agg["first"].astype(str)
+            agg["End_Payment"] = "Month " + agg["last"].astype(str)
+        agg.index = agg.index.astype(str)
+        return agg.rename_axis("Card").reset_index()[SUMMARY_COLUMNS]
+
+    # ---- Exports ----
+    @timed("export_long")
+    def to_parquet(self, path, start_date=None):
+        table = self.with_dates(start_date) if start_date is not None else self.table
+        table.to_parquet(path, index=False)
+        return path
+
+    @timed("export_long")
+    def to_feather(self, path, start_date=None):
+        table = self.with_dates(start_date) if start_date is not None else self.table
+        table.reset_index(drop=True).to_feather(path)
+        return path
+
+    @timed("export_excel")
+    def to_excel(self, path, streaming=True):
+        """
+        Workbook with a "Summary" sheet (monthly allocation) and one sheet per
+        card. With xlsxwriter installed and streaming=True, rows are written
+        in constant-memory mode; otherwise pandas' ExcelWriter is used.
+        """
+        sheets = [("Summary", self.monthly_summary)] + [(name, df) for name, df in self.schedules.items()]
+        count("rows_written", sum(len(df) for _, df in sheets))
+        try:
+            import xlsxwriter
+        except ImportError:
+            xlsxwriter = None
+
+        if xlsxwriter is None or not streaming:
+            with pd.ExcelWriter(path) as writer:
+                for name, df in sheets:
+                    df.to_excel(writer, sheet_name=name[:31], index=False)
+            return path
+
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        try:
+            for name, df in sheets:
+                ws = workbook.add_worksheet(name[:31])
+                ws.write_row(0, 0, [str(c) for c in df.columns])
+                columns = [df[c].tolist() for c in df.columns]
+                for r, row in enumerate(zip(*columns), start=1):
+                    ws.write_row(r, 0, row)
+        finally:
+            workbook.close()
+        return path
@@ -0,0 +1,264 @@
+"""
+amort_server
+------------
+Small asyncio HTTP service for scoring card portfolios (stdlib only).
+
+Endpoints (JSON in, JSON out):
+  GET  /health  -> {"status": "ok"}
+  POST /plan    -> one portfolio: {"id": ..., "max": 1000, "start_date": null,
+                   "cards": [{"Card": "Visa", "Balance": 1000, "APR": 18.2,
+                              "Min_Override": 0, "Min_Pct": 2}, ...]}
+                   answered with one result object
+  POST /batch   -> {"portfolios": [portfolio, ...]}, answered as JSON lines
+                   (application/x-ndjson, chunked), one result per portfolio
+                   in completion order
+
+Malformed requests get a 400 and planner failures a 500; once a batch is
+streaming, a failed chunk becomes one error line per portfolio in it.
+
+Card fields are the cards.csv columns and go through the same validation
+(rejected rows are reported, not fatal); a batch validates all cards of a
+chunk in one columnar pass. Portfolios are planned with the event-driven
+planner on a worker pool, `chunk_size` portfolios per task; a batch keeps at
+most `max_pending` chunks in flight and streams results as chunks finish.
+
+    python -m harspylib.amort.amort_server --port 8765 --processes 4
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .amort_allocator import CARD_COLUMNS, SimpleCard, validate_card_table
+from .amort_events import plan_multi_card_events
+
+MAX_BODY = 64 * 1024 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(pd.Timestamp(value).date())
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def _load_portfolio_cards(portfolios):
+    """
+    Validate the cards of many portfolios in one columnar pass. Returns, per
+    portfolio, (cards, rejected messages) or an error string.
+    """
+    rows, owner, local = [], [], []
+    loaded = [None] * len(portfolios)
+    for i, p in enumerate(portfolios):
+        cards = p.get("cards") if isinstance(p, dict) else None
+        if not isinstance(cards, list) or not all(isinstance(c, dict) for c in cards):
+            loaded[i] = "Expected \"cards\" to be a list of objects"
+            continue
+        rows.extend(cards)
+        owner.extend([i] * len(cards))
+        local.extend(range(len(cards)))
+
+    clean, rejected = validate_card_table(pd.DataFrame(rows, columns=None if rows else CARD_COLUMNS))
+    owner, local = np.asarray(owner, dtype=np.int64), np.asarray(local, dtype=np.int64)
+    cards = {i: [] for i in range(len(portfolios))}
+    for pos, name, b, a, o, pct in zip(clean.index, clean["name"].tolist(), clean["balance"].tolist(),
+                                       clean["apr_percent"].tolist(), clean["min_override"].tolist(),
+                                       clean["min_pct"].tolist()):
+        cards[owner[pos]].append(SimpleCard(name=name, balance=b, apr_percent=a, min_override=o,
+                                            min_pct=None if pct != pct else pct))
+    messages = {i: [] for i in range(len(portfolios))}
+    for pos, reason in zip(rejected["Row"].tolist(), rejected["Reason"].tolist()):
+        messages[owner[pos]].append(f"row {local[pos]}: {reason}")
+    return [loaded[i] if loaded[i] is not None else (cards[i], messages[i]) for i in range(len(portfolios))]
+
+
+def score_portfolios(portfolios):
+    """Plan a list of portfolio dicts. Never raises: failures come back with status "error"."""
+    results = []
+    for p, loaded in zip(portfolios, _load_portfolio_cards(portfolios)):
+        out = {"id": p.get("id") if isinstance(p, dict) else None, "status": "ok"}
+        try:
+            if isinstance(loaded, str):
+                raise ValueError(loaded)
+            cards, rejected = loaded
+            if rejected:
+                out["status"] = "partial"
+                out["rejected"] = rejected
+            if p.get("max") is None:
+                raise ValueError("Missing max")
+            if not cards:
+                raise ValueError("No valid cards")
+            plan = plan_multi_card_events(cards, float(p["max"]), start_date=p.get("start_date"))
+            out["months"] = plan.months
+            out["total_interest"] = round(float(plan.summary["Total_Interest"].sum()), 2)
+            out["summary"] = plan.summary.to_dict(orient="records")
+        except Exception as e:
+            out["status"] = "error"
+            out["error"] = f"{type(e).__name__}: {e}"
+        results.append(out)
+    return results
+
+
+class PlanServer:
+    """asyncio HTTP front end over a process (or thread) pool of planners."""
+
+    def __init__(self, processes=None, max_pending=None, chunk_size=32, use_threads=False):
+        workers = processes or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(workers) if use_threads else ProcessPoolExecutor(workers)
+        self.max_pending = max_pending or workers * 2
+        self.chunk_size = chunk_size
+
+    async def _plan(self, portfolios):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, score_portfolios, portfolios)
+
+    async def _plan_or_errors(self, chunk):
+        """Results for a chunk; if the pool itself fails, an error result per portfolio instead."""
+        try:
+            return await self._plan(chunk)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            return [{"id": p.get("id") if isinstance(p, dict) else None, "status": "error", "error": error}
+                    for p in chunk]
+
+    # ---- HTTP plumbing ----
+    async def _read_request(self, reader):
+        """(method, path, body), None on EOF; body is None when too large. Raises ValueError if malformed."""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise ValueError("Malformed request line")
+        method, path, _ = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise ValueError("Invalid Content-Length") from None
+        if length < 0:
+            raise ValueError("Invalid Content-Length")
+        if length > MAX_BODY:
+            return method, path, None
+        body = await reader.readexactly(length) if length else b""
+        return method, path, body
+
+    @staticmethod
+    async def _send(writer, status, payload):
+        data = json.dumps(payload, default=_json_default).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data)
+        await writer.drain()
+
+    async def _stream(self, writer, portfolios):
+        """Run a batch with a bounded window of chunks in flight, writing one JSON line per portfolio."""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+        chunks = iter([portfolios[i:i + self.chunk_size] for i in range(0, len(portfolios), self.chunk_size)])
+        pending = set()
+        for chunk in chunks:
+            pending.add(asyncio.ensure_future(self._plan_or_errors(chunk)))
+            if len(pending) >= self.max_pending:
+                break
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                data = b"".join(json.dumps(r, default=_json_default).encode("utf-8") + b"\n"
+                                for r in fut.result())
+                writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+                nxt = next(chunks, None)
+                if nxt is not None:
+                    pending.add(asyncio.ensure_future(self._plan_or_errors(nxt)))
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                request = await self._read_request(reader)
+            except ValueError as e:
+                await self._send(writer, 400, {"error": str(e)})
+                return
+            if request is None:
+                return
+            method, path, body = request
+            if body is None:
+                await self._send(writer, 413, {"error": f"Body larger than {MAX_BODY} bytes"})
+                return
+            if path == "/health":
+                await self._send(writer, 200, {"status": "ok"})
+                return
+            if path not in ("/plan", "/batch"):
+                await self._send(writer, 404, {"error": f"Unknown path {path}"})
+                return
+            if method != "POST":
+                await self._send(writer, 405, {"error": "Use POST"})
+                return
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError as e:
+                await self._send(writer, 400, {"error": f"Invalid JSON: {e}"})
+                return
+
+            if path == "/plan":
+                try:
+                    result = (await self._plan([payload]))[0]
+                except Exception as e:   # pool failure (e.g. BrokenProcessPool), not a bad portfolio
+                    await self._send(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+                    return
+                await self._send(writer, 200, result)
+            else:
+                portfolios = payload.get("portfolios") if isinstance(payload, dict) else None
+                if not isinstance(portfolios, list):
+                    await self._send(writer, 400, {"error": "Expected {\"portfolios\": [...]}"})
+                    return
+                await self._stream(writer, portfolios)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Amortization planning HTTP service")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--processes", type=int, default=None, help="Planner worker processes (default: CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=32, help="Portfolios per worker task (default: 32)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Chunks in flight per batch request (default: 2 x workers)")
+    args = parser.parse_args()
+
+    server = PlanServer(processes=args.processes, max_pending=args.max_pending, chunk_size=args.chunk_size)
+    print(f"Serving on http://{args.host}:{args.port} (POST /plan, POST /batch, GET /health)")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    main()
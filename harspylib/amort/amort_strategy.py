@@ -0,0 +1,110 @@
+"""
+amort_strategy
+--------------
+Payoff strategies and side-by-side comparison.
+
+A strategy decides which card receives the extra budget first; minimums are
+paid on every card regardless. It is either a built-in name, a list of card
+names in priority order (unlisted cards follow in avalanche order), or a
+callable taking a CardArrays and returning card indices in priority order.
+Built-ins rank on the opening balances and keep that order for the whole plan:
+  - avalanche        -> highest APR first (the planner's default)
+  - snowball         -> smallest balance first
+  - highest_balance  -> largest balance first
+
+compare_strategies evaluates every (strategy, budget) pair as one row of a
+single batched simulation (amort_engine.simulate_batch).
+"""
+import numpy as np
+import pandas as pd
+
+from .amort_engine import CardArrays, MAX_MONTHS, simulate_batch
+
+COMPARE_COLUMNS = ["Strategy", "Budget", "Paid_Off", "Months", "Total_Interest", "Total_Paid",
+                   "Interest_vs_Best"]
+
+
+def _avalanche(arrays):
+    return arrays.avalanche_order()
+
+
+def _snowball(arrays):
+    return np.argsort(arrays.balance, kind="stable")
+
+
+def _highest_balance(arrays):
+    return np.argsort(-arrays.balance, kind="stable")
+
+
+STRATEGIES = {
+    "avalanche": _avalanche,
+    "snowball": _snowball,
+    "highest_balance": _highest_balance,
+}
+
+
+def strategy_order(strategy, arrays: CardArrays):
+    """Card indices in the priority order of `strategy`."""
+    if isinstance(strategy, str):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
+        order = STRATEGIES[strategy](arrays)
+    elif callable(strategy):
+        order = strategy(arrays)
+    else:
+        names = list(strategy)
+        unknown = [n for n in names if n not in arrays.names]
+        if unknown:
+            raise ValueError(f"Unknown cards in priority list: {', '.join(unknown)}")
+        first = [arrays.names.index(n) for n in dict.fromkeys(names)]
+        rest = [i for i in arrays.avalanche_order() if i not in set(first)]
+        order = first + rest
+
+    order = np.asarray(order, dtype=np.int64)
+    if sorted(order.tolist()) != list(range(len(arrays))):
+        raise ValueError("A strategy must rank every card exactly once")
+    return order
+
+
+def _label(strategy):
+    if isinstance(strategy, str):
+        return strategy
+    if callable(strategy):
+        return getattr(strategy, "__name__", "custom")
+    return "custom: " + " > ".join(strategy)
+
+
+def compare_strategies(cards, max_allowed, strategies=("avalanche", "snowball"), max_months=MAX_MONTHS):
+    """
+    Plan every strategy (and every budget, when `max_allowed` is a list) over
+    the same cards in one batched pass. `strategies` is a sequence of
+    strategies or a dict of label -> strategy. Returns one row per
+    (strategy, budget) with tenure, total interest, total paid and the extra
+    interest over the cheapest strategy at that budget.
+    """
+    arrays = cards if isinstance(cards, CardArrays) else CardArrays.from_cards(cards)
+    if isinstance(strategies, dict):
+        labels, specs = list(strategies), list(strategies.values())
+    else:
+        specs = list(strategies)
+        labels = [_label(s) for s in specs]
+    if not specs:
+        raise ValueError("Give at least one strategy")
+
+    orders = np.stack([strategy_order(s, arrays) for s in specs])
+    budgets = np.atleast_1d(np.asarray(max_allowed, dtype=float))
+    # One plan per (strategy, budget); strategy-major rows
+    res = simulate_batch(arrays, np.tile(budgets, len(specs)), order=np.repeat(orders, budgets.size, axis=0),
+                         max_months=max_months)
+
+    df = pd.DataFrame({
+        "Strategy": np.repeat(labels, budgets.size),
+        "Budget": np.tile(budgets, len(specs)),
+        "Paid_Off": res.finished,
+        "Months": res.months,
+        "Total_Interest": np.round(res.interest.sum(axis=1), 2),
+        "Total_Paid": np.round(res.paid.sum(axis=1), 2),
+    })
+    best = df.groupby("Budget")["Total_Interest"].transform("min")
+    df["Interest_vs_Best"] = (df["Total_Interest"] - best).round(2)
+    return df[COMPARE_COLUMNS]
@@ -0,0 +1,133 @@
+"""
+amort_stream
+------------
+Streaming schedule API: months are yielded as they are simulated and
+consumed incrementally by pluggable sinks, so peak memory does not grow
+with tenure x cards and the first rows reach disk before planning ends.
+
+A sink has three methods:
+  open(names)    -> called once with the card names (input order)
+  write(block)   -> called with every amort_engine.MonthBlock
+  close()        -> flushes and returns the sink's result
+
+Built-in sinks:
+  - MemorySink   -> (schedules, monthly_summary), as plan_multi_card_with_max
+  - CsvSink      -> long schedule rows or the wide monthly allocation, to CSV
+  - ParquetSink  -> the same layouts as Parquet row groups (needs pyarrow)
+"""
+import pandas as pd
+
+from .amort_engine import (
+    CardArrays, MemorySink, SCHEDULE_COLUMNS, iter_months, long_columns, wide_columns,
+)
+
+__all__ = ["iter_schedule", "stream_plan", "MemorySink", "CsvSink", "ParquetSink"]
+
+
+def iter_schedule(cards, max_allowed):
+    """Yield one MonthBlock per simulated month. `cards` is a list of SimpleCard or a CardArrays."""
+    arrays = cards if isinstance(cards, CardArrays) else CardArrays.from_cards(cards)
+    return iter_months(arrays, max_allowed)
+
+
+def stream_plan(cards, max_allowed, *sinks):
+    """
+    Run the plan once and feed every month to each sink as it is computed.
+    Returns the result of close() for one sink, or a tuple for several.
+    """
+    arrays = cards if isinstance(cards, CardArrays) else CardArrays.from_cards(cards)
+    for sink in sinks:
+        sink.open(arrays.names)
+    try:
+        for block in iter_months(arrays, max_allowed):
+            for sink in sinks:
+                sink.write(block)
+    finally:
+        results = tuple(sink.close() for sink in sinks)
+    return results[0] if len(results) == 1 else results
+
+
+class _BufferedTableSink:
+    """
+    Buffers month blocks and flushes them as one table every `rows_per_flush`
+    rows. layout="long" writes SCHEDULE_COLUMNS rows (one per card per
+    month); layout="wide" writes the monthly allocation (Month + card columns).
+    """
+
+    def __init__(self, path, layout="long", rows_per_flush=50000):
+        if layout not in ("long", "wide"):
+            raise ValueError(f"Unknown layout: {layout}")
+        self.path = path
+        self.layout = layout
+        self.rows_per_flush = rows_per_flush
+        self.rows_written = 0
+
+    def open(self, names):
+        self.names = list(names)
+        self._blocks = []
+        self._buffered = 0
+
+    def write(self, block):
+        self._blocks.append(block)
+        self._buffered += block.idx.size if self.layout == "long" else 1
+        if self._buffered >= self.rows_per_flush:
+            self.flush()
+
+    def _frame(self):
+        if self.layout == "long":
+            cols, _ = long_columns(self._blocks, self.names)
+            return pd.DataFrame(cols, columns=SCHEDULE_COLUMNS)
+        return pd.DataFrame(wide_columns(self._blocks, self.names))
+
+    def flush(self):
+        if not self._blocks:
+            return
+        df = self._frame()
+        self._blocks, self._buffered = [], 0
+        self._write_frame(df)
+        self.rows_written += len(df)
+
+    def close(self):
+        self.flush()
+        self._finish()
+        return self.path
+
+
+class CsvSink(_BufferedTableSink):
+    """Append schedule rows to a CSV file, header written once."""
+
+    def open(self, names):
+        super().open(names)
+        self._header = True
+
+    def _write_frame(self, df):
+        df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+        self._header = False
+
+    def _finish(self):
+        if self._header:  # nothing was simulated; still leave a valid file
+            columns = SCHEDULE_COLUMNS if self.layout == "long" else ["Month"] + self.names
+            pd.DataFrame(columns=columns).to_csv(self.path, index=False)
+
+
+class ParquetSink(_BufferedTableSink):
+    """Write schedule rows to a Parquet file, one row group per flush."""
+
+    def open(self, names):
+        super().open(names)
+        self._writer = None
+
+    def _write_frame(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def _finish(self):
+        if self._writer is not None:
+            self._writer.close()
+        else:
+            columns = SCHEDULE_COLUMNS if self.layout == "long" else ["Month"] + self.names
+            pd.DataFrame(columns=columns).to_parquet(self.path, index=False)
@@ -0,0 +1,111 @@
+"""
+amort_sweep
+-----------
+Evaluate many `max_allowed` budgets over the same cards in one call, and
+search for the smallest budget that meets a target tenure or interest cap.
+
+Cards are loaded once and converted to columns once; every budget is a row
+of one batched simulation (amort_engine.simulate_batch), optionally split
+into chunks across a process pool. Source cards are never modified.
+"""
+import math
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from .amort_engine import CardArrays, MAX_MONTHS, simulate_batch
+
+SWEEP_COLUMNS = ["Budget", "Paid_Off", "Months", "Total_Interest", "Total_Paid"]
+
+
+@dataclass
+class BudgetSolution:
+    budget: float           # smallest monthly budget meeting the target
+    months: int             # tenure at that budget
+    total_interest: float   # total interest at that budget
+
+
+def _sweep_chunk(arrays, budgets, max_months=MAX_MONTHS):
+    res = simulate_batch(arrays, budgets, max_months=max_months)
+    return res.finished, res.months, res.interest.sum(axis=1), res.paid.sum(axis=1)
+
+
+def sweep_budgets(cards, budgets, processes=None, chunk_size=256, max_months=MAX_MONTHS):
+    """
+    Plan every budget in `budgets` and return one row per budget with the
+    tenure, total interest and total paid. Budgets below the sum of the
+    minimums are raised to it month by month, as in plan_multi_card_with_max.
+    Budgets that never clear the debt within `max_months` get Paid_Off=False
+    and the totals reached by then.
+    processes > 1 splits the budgets into chunks over a process pool.
+    """
+    arrays = CardArrays.from_cards(cards)
+    budgets = np.asarray(budgets, dtype=float).reshape(-1)
+    chunks = [budgets[i:i + chunk_size] for i in range(0, budgets.size, chunk_size)] or [budgets]
+
+    if processes and processes > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(_sweep_chunk, [arrays] * len(chunks), chunks,
+                                  [max_months] * len(chunks)))
+    else:
+        parts = [_sweep_chunk(arrays, chunk, max_months) for chunk in chunks]
+
+    finished, months, interest, paid = (np.concatenate([p[i] for p in parts]) for i in range(4))
+    return pd.DataFrame({
+        "Budget": budgets,
+        "Paid_Off": finished,
+        "Months": months,
+        "Total_Interest": np.round(interest, 2),
+        "Total_Paid": np.round(paid, 2),
+    }, columns=SWEEP_COLUMNS)
+
+
+def solve_min_budget(cards, target_months=None, max_interest=None, tol=0.01, points=16,
+                     max_months=MAX_MONTHS):
+    """
+    Smallest budget whose plan finishes within `target_months` and/or keeps
+    total interest at or below `max_interest`. Tenure and interest only go
+    down as the budget goes up, so the search narrows a bracket by evaluating
+    `points` budgets per round in one batched pass (a k-ary bisection).
+    Returns a BudgetSolution, or None when no budget can meet the target.
+    """
+    if target_months is None and max_interest is None:
+        raise ValueError("Give target_months and/or max_interest")
+
+    arrays = CardArrays.from_cards(cards)
+    if target_months is not None:
+        max_months = min(max_months, target_months)   # longer plans fail the target anyway
+
+    def meets(res):
+        ok = res.finished.copy()
+        if target_months is not None:
+            ok &= res.months <= target_months
+        if max_interest is not None:
+            ok &= res.interest.sum(axis=1) <= max_interest + 1e-9
+        return ok
+
+    # Paying every balance plus one month of interest clears everything in month 1
+    hi = float(np.sum(arrays.balance * (1 + arrays.monthly_rate)))
+    lo = 0.0
+    res = simulate_batch(arrays, [lo, hi], max_months=max_months)
+    ok = meets(res)
+    if ok[0]:
+        hi = lo
+    elif not ok[1]:
+        return None
+
+    while hi - lo > tol:
+        grid = np.linspace(lo, hi, points + 2)[1:-1]
+        ok = meets(simulate_batch(arrays, grid, max_months=max_months))
+        first = int(np.argmax(ok)) if ok.any() else None
+        if first is None:
+            lo = grid[-1]
+        else:
+            hi = grid[first]
+            lo = grid[first - 1] if first > 0 else lo
+
+    budget = math.ceil(round(hi * 100, 6)) / 100   # whole cents, never below the bracket
+    res = simulate_batch(arrays, [budget], max_months=max_months)
+    return BudgetSolution(budget=budget, months=int(res.months[0]),
+                          total_interest=round(float(res.interest.sum()), 2))
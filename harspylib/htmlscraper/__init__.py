@@ -3,4 +3,4 @@ harspylib.htmlscraper
 ---------------------
 Scraper for local HTML files → Markdown outputs
 """
-from .htmlscraper import process_html
+from .htmlscraper import check_parsers, extract_links, extract_links_from_file, process_file, process_html
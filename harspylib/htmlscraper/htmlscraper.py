@@ -9,10 +9,15 @@ Generates two Markdown files:
 """
 
 import argparse
+import mmap
 import os
+import pathlib
 import re
+import sys
+import time
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
+from lxml import etree, html
 
 
 def clean_text(raw_text: str) -> str:
@@ -20,39 +25,198 @@ def clean_text(raw_text: str) -> str:
     return re.sub(r"\s+", " ", (raw_text or "").strip())
 
 
-def process_html(content, base_name, base_url=""):
-    """Parse HTML and export two Markdown files."""
-    soup = BeautifulSoup(content, "html.parser")
+PARSERS = ("bs4", "lxml", "stream")
+CHUNK_SIZE = 1 << 20   # bytes fed to the lxml parsers at a time
+# Text inside these is not anchor text (BeautifulSoup's get_text skips it too)
+SKIP_TEXT_TAGS = {"script", "style", "template", "rt", "rp"}
 
-    # If HTML has <base>, override base_url
+
+# ---- Parser backends: each returns (<base> href or None, [(text, href), ...]) ----
+def _anchors_bs4(content):
+    """The reference backend: a full BeautifulSoup tree with html.parser."""
+    soup = BeautifulSoup(content, "html.parser")
     base_tag = soup.find("base")
-    if base_tag and base_tag.get("href"):
-        base_url = base_tag["href"]
+    base_href = base_tag.get("href") if base_tag else None
+    return base_href, [(a.get_text(), a.get("href")) for a in soup.find_all("a", href=True)]
 
-    output_md_full = base_name + "_full.md"
-    output_md_relative = base_name + "_relative.md"
+
+def _element_text(el):
+    """Text of an lxml element without comments and SKIP_TEXT_TAGS content, like get_text()."""
+    if next(el.iterancestors("template"), None) is not None:
+        return ""   # template content is not document text
+    parts = []
+
+    def walk(node):
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            if isinstance(child.tag, str) and child.tag not in SKIP_TEXT_TAGS:   # comments/PIs have no tag
+                walk(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    walk(el)
+    return "".join(parts)
+
+
+def _chunks(content):
+    """Bytes chunks of str/bytes content, or of a file (os.PathLike) through mmap."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        for i in range(0, len(content), CHUNK_SIZE):
+            yield content[i:i + CHUNK_SIZE]
+        return
+    with open(content, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for i in range(0, len(mm), CHUNK_SIZE):
+                yield mm[i:i + CHUNK_SIZE]
+
+
+def _anchors_lxml(content):
+    """Full lxml tree (C parser), fed in chunks."""
+    parser = html.HTMLParser(encoding="utf-8")
+    for chunk in _chunks(content):
+        parser.feed(chunk)
+    try:
+        root = parser.close()
+    except (etree.ParserError, etree.XMLSyntaxError):   # empty document
+        return None, []
+    base_tag = next(root.iter("base"), None)
+    base_href = base_tag.get("href") if base_tag is not None else None
+    return base_href, [(_element_text(a), a.get("href")) for a in root.iter("a") if a.get("href") is not None]
+
+
+def _anchors_stream(content):
+    """
+    Incremental lxml parse that keeps only the anchor being read: finished
+    elements outside anchors are cleared and dropped as the parse goes, so
+    memory stays flat however large the file is.
+    """
+    parser = etree.HTMLPullParser(events=("start", "end"), encoding="utf-8")
+    base_href, seen_base, anchors, open_anchors = None, False, [], 0
+
+    for chunk in _chunks(content):
+        parser.feed(chunk)
+        for event, el in parser.read_events():
+            tag = el.tag
+            if not isinstance(tag, str):
+                continue
+            if event == "start":
+                if tag == "a":
+                    open_anchors += 1
+                elif tag == "base" and not seen_base:
+                    seen_base, base_href = True, el.get("href")
+                continue
+            if tag == "a":
+                open_anchors -= 1
+                if el.get("href") is not None:
+                    anchors.append((_element_text(el), el.get("href")))
+            if open_anchors == 0:
+                el.clear()
+                parent = el.getparent()
+                while parent is not None and el.getprevious() is not None:
+                    del parent[0]
+    try:
+        parser.close()
+    except (etree.ParserError, etree.XMLSyntaxError):
+        pass
+    return base_href, anchors
+
+
+BACKENDS = {"bs4": _anchors_bs4, "lxml": _anchors_lxml, "stream": _anchors_stream}
+
+
+def extract_links(content, base_url="", parser="bs4"):
+    """
+    Anchor links of an HTML document (str, bytes, or an os.PathLike file
+    path) as (markdown lines, relative URLs, effective base URL).
+    parser is one of PARSERS; "bs4" is the reference, "lxml" builds the tree
+    in C, "stream" never holds the whole tree.
+    """
+    if parser not in BACKENDS:
+        raise ValueError(f"Unknown parser {parser!r}; expected one of {', '.join(PARSERS)}")
+    if parser == "bs4" and isinstance(content, os.PathLike):
+        with open(content, "r", encoding="utf-8") as f:
+            content = f.read()
+    base_href, anchors = BACKENDS[parser](content)
+
+    # If HTML has <base>, override base_url
+    if base_href:
+        base_url = base_href
+    base_netloc = urlparse(base_url).netloc
 
     full_markdown_lines = []
     relative_urls = []
+    resolved_hrefs = {}   # href -> (resolved URL, relative path or None); exports repeat nav links a lot
 
-    for a in soup.find_all("a", href=True):
-        anchor_text = clean_text(a.get_text())
-        href = a.get("href")
+    for raw_text, href in anchors:
         if not href:
             continue
+        anchor_text = clean_text(raw_text)
+
+        known = resolved_hrefs.get(href)
+        if known is None:
+            # Resolved absolute URL
+            resolved = urljoin(base_url, href) if base_url else href
+
+            # Only keep relative links
+            relative = None
+            if href.startswith("/"):
+                relative = href
+            elif base_url:
+                parsed = urlparse(resolved)
+                if parsed.netloc == base_netloc:
+                    relative = parsed.path
+            known = resolved_hrefs[href] = (resolved, relative)
 
-        # Resolved absolute URL
-        resolved = urljoin(base_url, href) if base_url else href
+        resolved, relative = known
         full_markdown_lines.append(f"- [{anchor_text}]({resolved})")
+        if relative is not None:
+            relative_urls.append(relative)
+
+    return full_markdown_lines, relative_urls, base_url
+
+
+def extract_links_from_file(path, base_url="", parser="bs4"):
+    """extract_links on a file; the lxml backends read it memory-mapped, in chunks."""
+    return extract_links(pathlib.Path(path), base_url, parser)
 
-        # Only keep relative links
-        if href.startswith("/"):
-            relative_urls.append(href)
-        else:
-            parsed = urlparse(resolved)
-            base_parsed = urlparse(base_url)
-            if base_url and parsed.netloc == base_parsed.netloc:
-                relative_urls.append(parsed.path)
+
+def check_parsers(content, base_url="", parsers=PARSERS):
+    """
+    Run every backend on the same input and compare with the "bs4" reference.
+    Returns {parser: {"seconds", "links", "matches", "first_difference"}}.
+    """
+    report = {}
+    reference = None
+    for name in ("bs4",) + tuple(p for p in parsers if p != "bs4"):
+        t0 = time.perf_counter()
+        out = extract_links(content, base_url, parser=name)
+        seconds = time.perf_counter() - t0
+        if reference is None:
+            reference = out
+        diff = None
+        if out[2] != reference[2]:
+            diff = f"base URL {out[2]!r} != {reference[2]!r}"
+        elif out[0] != reference[0]:
+            i = next((i for i, (x, y) in enumerate(zip(out[0], reference[0])) if x != y),
+                     min(len(out[0]), len(reference[0])))
+            diff = f"link {i}: {out[0][i] if i < len(out[0]) else None!r} != " \
+                   f"{reference[0][i] if i < len(reference[0]) else None!r}"
+        elif sorted(set(out[1])) != sorted(set(reference[1])):
+            diff = "relative URLs differ"
+        report[name] = {"seconds": seconds, "links": len(out[0]), "matches": diff is None,
+                        "first_difference": diff}
+    return report
+
+
+def write_markdown(full_markdown_lines, relative_urls, base_url, base_name):
+    """Write the two Markdown reports."""
+    output_md_full = base_name + "_full.md"
+    output_md_relative = base_name + "_relative.md"
 
     # Write full markdown
     with open(output_md_full, "w", encoding="utf-8") as f:
@@ -68,6 +232,16 @@ def process_html(content, base_name, base_url=""):
     print(f"   → {output_md_relative} (base + relative URLs)")
 
 
+def process_html(content, base_name, base_url="", parser="bs4"):
+    """Parse HTML and export two Markdown files."""
+    write_markdown(*extract_links(content, base_url, parser), base_name)
+
+
+def process_file(path, base_name, base_url="", parser="bs4"):
+    """process_html for a file on disk, without reading it into memory first for the lxml backends."""
+    write_markdown(*extract_links_from_file(path, base_url, parser), base_name)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="html_link_scraper: Extract links from a local HTML file and export Markdown reports."
@@ -81,12 +255,27 @@ def main():
         help="Optional base URL for resolving relative links (default: none)"
     )
 
+    parser.add_argument(
+        "--parser", "-p", choices=PARSERS, default="bs4",
+        help="Parser backend: bs4 (reference), lxml (fast, full tree) or stream "
+             "(fast, incremental; for very large files) (default: bs4)"
+    )
+    parser.add_argument(
+        "--check", action="store_true",
+        help="Run every parser backend on the file, compare with bs4 and report timings"
+    )
+
     args = parser.parse_args()
 
     base_name, _ = os.path.splitext(args.htmlfile)
-    with open(args.htmlfile, "r", encoding="utf-8") as f:
-        content = f.read()
-    process_html(content, base_name, args.baseurl)
+    if args.check:
+        report = check_parsers(pathlib.Path(args.htmlfile), args.baseurl)
+        for name, r in report.items():
+            status = "✅ matches bs4" if r["matches"] else f"❌ {r['first_difference']}"
+            print(f"{name:<7} {r['seconds'] * 1000:10.1f} ms {r['links']:8d} links  {status}")
+        sys.exit(0 if all(r["matches"] for r in report.values()) else 1)
+
+    process_file(args.htmlfile, base_name, args.baseurl, parser=args.parser)
 
 
 if __name__ == "__main__":
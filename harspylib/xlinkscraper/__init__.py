@@ -3,5 +3,51 @@ harspylib.xlinkscraper
 ----------------------
 Scraper for web pages using XPath.
 Supports static and dynamic pages, Selenium recursion, headless mode.
+Many URLs can be fetched concurrently in static mode (xlinkfetch) and whole
+sites crawled breadth-first (xlinkcrawl), optionally through an on-disk
+conditional HTTP cache (xlinkcache). Dynamic pages can share a pool of warm
+browsers (xlinkpool), and auto mode (xlinkauto) uses one only for pages that
+need it.
+Selenium is only imported when the scraper module is first used; static
+parsing (xlinkparse) and the fetch, crawl, cache and auto modules do not
+need it.
 """
-from .xlinkscraper import extract_links_dynamic
+import importlib
+
+_SUBMODULES = [
+    "xlinkscraper",
+    "xlinkparse",
+    "xlinkfetch",
+    "xlinkcrawl",
+    "xlinkcache",
+    "xlinkpool",
+    "xlinkauto",
+]
+
+# Public names re-exported from submodules: name -> submodule
+_ATTRS = {
+    "extract_links_dynamic": "xlinkscraper",
+    "extract_links_static": "xlinkparse",
+    "fetch_many": "xlinkfetch",
+    "SiteCrawler": "xlinkcrawl",
+    "HTTPCache": "xlinkcache",
+    "DriverPool": "xlinkpool",
+    "extract_links_auto": "xlinkauto",
+}
+
+__all__ = _SUBMODULES + list(_ATTRS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    elif name in _ATTRS:
+        value = getattr(importlib.import_module(f".{_ATTRS[name]}", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
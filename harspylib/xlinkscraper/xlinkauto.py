@@ -0,0 +1,116 @@
+"""
+xlinkauto.py
+------------
+Static-first extraction with automatic fallback to a browser.
+
+Every URL is first fetched and parsed statically (concurrently, through the
+HTTP cache when one is configured). A URL is escalated to Selenium only when
+  - the static fetch failed,
+  - the XPath container is missing from the served HTML,
+  - it yields fewer than `min_links` anchors, or
+  - the page looks client-rendered (an empty app mount point such as
+    <div id="root"></div>, or a body with almost no text besides scripts).
+Escalated URLs share a pool of warm browsers (xlinkpool). Each result
+records the path the URL took and why.
+
+    python -m harspylib.xlinkscraper.xlinkscraper --auto --urls-file urls.txt \\
+        --xpath "//nav" --filename docs --min-links 5
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from lxml import html
+
+from .xlinkfetch import StaticFetcher
+from .xlinkparse import links_from_tree
+
+MOUNT_IDS = ("root", "app", "__next", "__nuxt", "___gatsby", "svelte", "main-app")
+GONE_STATUS = {404, 410}
+MIN_BODY_TEXT = 200   # characters of visible text below which a scripted page counts as client-rendered
+
+
+@dataclass
+class AutoResult:
+    url: str
+    path: str                      # "static" or "dynamic"
+    reason: Optional[str] = None   # why the URL was escalated
+    links: List[Tuple[str, str, str]] = field(default_factory=list)
+    base_url: Optional[str] = None
+    error: Optional[str] = None
+
+
+def looks_client_rendered(tree):
+    """True for an empty app mount point, or a scripted page with next to no body text."""
+    for mount in MOUNT_IDS:
+        if tree.xpath(f'//*[@id="{mount}"][not(*)][not(normalize-space())]'):
+            return True
+    if not tree.xpath("//script"):
+        return False
+    text = "".join(tree.xpath("//body//text()[not(ancestor::script or ancestor::style or ancestor::noscript)]"))
+    return len(" ".join(text.split())) < MIN_BODY_TEXT
+
+
+def fallback_reason(tree, xpath_expr, links, min_links=1):
+    """Why a statically parsed page should be rendered in a browser, or None when the static links suffice."""
+    if not tree.xpath(xpath_expr):
+        return "container not found"
+    if len(links) < min_links:
+        return f"{len(links)} anchors (< {min_links})"
+    if looks_client_rendered(tree):
+        return "client-rendered page"
+    return None
+
+
+def probe_static(content, base_url, xpath_expr, min_links=1):
+    """(links, fallback reason) from one parse of a statically fetched page."""
+    tree = html.fromstring(content)
+    links = links_from_tree(tree, base_url, xpath_expr)
+    return links, fallback_reason(tree, xpath_expr, links, min_links)
+
+
+def extract_links_auto(urls, xpath_expr, min_links=1, fetcher=None, maxdepth=None, click_xpath=None, workers=2,
+                       headless=True, on_result=None, settle_quiet=None, settle_timeout=None):
+    """
+    Static-first extraction over `urls`; returns {url: AutoResult} in input
+    order. `fetcher` is a StaticFetcher for the static pass (a default one
+    otherwise; its xpath and extract hook are replaced); on_result(result) is
+    called as each URL finishes. settle_quiet/settle_timeout override the
+    dynamic-mode settle defaults (see xlinkscraper.wait_for_settle).
+    """
+    fetcher = fetcher or StaticFetcher(xpath_expr)
+    fetcher.xpath = xpath_expr
+    fetcher.extract = lambda content, base_url, xpath: probe_static(content, base_url, xpath, min_links)
+
+    results = {}
+    escalate = []
+
+    def triage(r):
+        if r.error and r.status in GONE_STATUS:   # a browser would get the same answer
+            results[r.url] = AutoResult(r.url, "static", error=r.error)
+        else:
+            reason = f"static fetch failed ({r.error})" if r.error else r.note
+            if reason:
+                escalate.append(r.url)
+                results[r.url] = AutoResult(r.url, "dynamic", reason)
+                return
+            results[r.url] = AutoResult(r.url, "static", links=r.links, base_url=r.final_url or r.url)
+        if on_result is not None:
+            on_result(results[r.url])
+
+    fetcher.run(urls, on_result=triage)
+
+    if escalate:
+        from .xlinkpool import extract_links_dynamic_many
+
+        def finished(url, links, error):
+            result = results[url]
+            result.links, result.base_url, result.error = links, url, error
+            if on_result is not None:
+                on_result(result)
+
+        # Selenium is only imported here, once some page needs a browser
+        settle = {k: v for k, v in (("settle_quiet", settle_quiet), ("settle_timeout", settle_timeout))
+                  if v is not None}
+        extract_links_dynamic_many(escalate, xpath_expr, maxdepth, click_xpath, workers=min(workers, len(escalate)),
+                                   headless=headless, on_result=finished, **settle)
+    return {url: results[url] for url in urls}
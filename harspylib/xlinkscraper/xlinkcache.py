@@ -0,0 +1,241 @@
+"""
+xlinkcache.py
+-------------
+On-disk HTTP cache with conditional revalidation for the static fetchers
+(fetch_static_html and xlinkfetch).
+
+Each page is stored data-only under a SHA-256 of the URL: the body as raw
+bytes (<key>.body) and a JSON sidecar (<key>.json) with the URL, final URL,
+encoding, status, ETag, Last-Modified and fetch time, so a shared cache
+directory cannot inject code the way unpickling would. A stored page is
+  - served without any request while it is younger than `ttl`,
+  - otherwise revalidated with If-None-Match / If-Modified-Since: a 304
+    answer is served from the cache and refreshes the entry, a 200
+    replaces it.
+With `offline=True` nothing is requested: hits are served whatever their
+age and misses raise LookupError, which makes runs reproducible without
+network access. Entries unused for `max_age` seconds are evicted, and the
+least recently used ones go first when the directory exceeds `max_bytes`.
+
+The CLI enables it with --cache-dir (or the XLINK_CACHE_DIR environment
+variable), --cache-ttl, --cache-max-age, --cache-mb and --offline.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+CACHE_VERSION = "2"
+
+
+@dataclass
+class CachedPage:
+    url: str
+    final_url: str
+    content: bytes
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored: float
+    status: int = 200
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
+def conditional_headers(page):
+    """If-None-Match / If-Modified-Since for revalidating a stored page (empty for None)."""
+    headers = {}
+    if page is not None:
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+    return headers
+
+
+class HTTPCache:
+    """Disk cache of page bodies with validators; see module docstring. Thread-safe."""
+
+    def __init__(self, directory, ttl=0, max_age=None, max_bytes=512 * 1024 * 1024, offline=False):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._bytes = None   # directory size, scanned on first store
+        self._lock = threading.Lock()
+        self._stats = {"fresh_hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        """(sidecar, body) paths of a URL's entry."""
+        key = hashlib.sha256(f"{CACHE_VERSION}|{url}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.json"), os.path.join(self.directory, f"{key}.body")
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _load(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("url") != url:
+                return None
+            with open(body_path, "rb") as f:
+                content = f.read()
+            return CachedPage(url=url, final_url=meta["final_url"], content=content, encoding=meta["encoding"],
+                              etag=meta["etag"], last_modified=meta["last_modified"],
+                              stored=float(meta["stored"]), status=int(meta["status"]))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def _replace(self, path, data):
+        """Atomically write `data` to `path`; returns the change in bytes on disk."""
+        try:
+            old = os.path.getsize(path)
+        except OSError:
+            old = 0
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return len(data) - old
+
+    def _write(self, page, body=True):
+        """Store `page`; body=False only rewrites the sidecar (a 304 leaves the body as is)."""
+        meta_path, body_path = self._paths(page.url)
+        meta = {"url": page.url, "final_url": page.final_url, "encoding": page.encoding, "status": page.status,
+                "etag": page.etag, "last_modified": page.last_modified, "stored": page.stored}
+        try:
+            # Body first: an entry is only visible once its sidecar exists
+            size = self._replace(body_path, page.content) if body else 0
+            size += self._replace(meta_path, json.dumps(meta).encode("utf-8"))
+        except OSError:
+            return
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += size
+            over = self.max_bytes and (self._bytes is None or self._bytes > self.max_bytes)
+        if over:
+            self.trim()
+
+    # ---- Public API ----
+    def lookup(self, url):
+        """
+        (page, fresh): the stored page or None, and whether it can be served
+        without a request (younger than ttl, or offline). Offline misses raise
+        LookupError.
+        """
+        page = self._load(url)
+        if page is not None and (self.offline or (self.ttl and time.time() - page.stored < self.ttl)):
+            try:
+                os.utime(self._paths(url)[0])   # mark as recently used
+            except OSError:
+                pass
+            self._count("fresh_hits")
+            return page, True
+        if self.offline:
+            self._count("misses")
+            raise LookupError(f"Not in cache (offline): {url}")
+        return page, False
+
+    def update(self, url, status, headers, content=None, final_url=None, encoding=None, stale=None):
+        """
+        Record the response to a request made with conditional_headers(stale).
+        A 304 refreshes and returns `stale`, a 200 is stored and returned;
+        anything else returns None and leaves the cache alone.
+        """
+        if status == 304:
+            if stale is None:
+                return None
+            stale.stored = time.time()
+            stale.etag = headers.get("ETag") or stale.etag
+            stale.last_modified = headers.get("Last-Modified") or stale.last_modified
+            self._write(stale, body=False)
+            self._count("revalidated")
+            return stale
+        if status != 200 or content is None:
+            return None
+        self._count("misses")
+        page = CachedPage(url=url, final_url=final_url or url, content=content, encoding=encoding,
+                          etag=headers.get("ETag"), last_modified=headers.get("Last-Modified"),
+                          stored=time.time(), status=status)
+        if "no-store" not in (headers.get("Cache-Control") or ""):
+            self._write(page)
+            self._count("stores")
+        return page
+
+    def trim(self):
+        """Evict entries unused for max_age, then least recently used ones until under max_bytes."""
+        entries = {}   # key -> [last used, bytes]
+        for name in os.listdir(self.directory):
+            key, ext = os.path.splitext(name)
+            if ext not in (".json", ".body"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entry = entries.setdefault(key, [0.0, 0])
+            entry[1] += st.st_size
+            if ext == ".json":
+                entry[0] = st.st_mtime
+        total = sum(size for _, size in entries.values())
+        cutoff = time.time() - self.max_age if self.max_age else None
+        for mtime, size, key in sorted((used, size, key) for key, (used, size) in entries.items()):
+            if (cutoff is None or mtime >= cutoff) and (not self.max_bytes or total <= self.max_bytes):
+                break
+            for ext in (".json", ".body"):
+                try:
+                    os.remove(os.path.join(self.directory, key + ext))
+                except OSError:
+                    pass
+            total -= size
+            self._count("evictions")
+        with self._lock:
+            self._bytes = total
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+        requests_saved = out["fresh_hits"] + out["revalidated"]
+        lookups = requests_saved + out["misses"]
+        out["hit_rate"] = requests_saved / lookups if lookups else 0.0
+        return out
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """
+    Cache used by fetch_static_html when none is passed: None unless
+    XLINK_CACHE_DIR is set (XLINK_CACHE_TTL, XLINK_CACHE_MB and
+    XLINK_OFFLINE=1 tune it).
+    """
+    global _default_cache
+    directory = os.environ.get("XLINK_CACHE_DIR")
+    if not directory:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache(
+                directory,
+                ttl=float(os.environ.get("XLINK_CACHE_TTL", 0)),
+                max_bytes=int(float(os.environ.get("XLINK_CACHE_MB", 512)) * 1024 * 1024),
+                offline=os.environ.get("XLINK_OFFLINE") == "1",
+            )
+        return _default_cache
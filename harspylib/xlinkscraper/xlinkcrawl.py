@@ -0,0 +1,400 @@
+"""
+xlinkcrawl.py
+-------------
+Breadth-first same-site crawler on top of the concurrent static fetcher.
+
+Starting from one or more seed URLs, every page is fetched (xlinkfetch),
+the anchors under the XPath container are extracted, and links on the
+seeds' hosts are followed breadth-first up to `max_depth` hops and/or
+`max_pages` fetched pages. Every discovered page is appended once to a
+site map in the `_full.md` format.
+
+URLs are canonicalized for dedup (lower-case scheme and host, default
+port, fragment and trailing slash dropped, query parameters sorted), but
+the URL as linked (minus its fragment) is what gets fetched and recorded. The
+visited set keeps 64-bit digests in a sorted array, about 10-17 bytes per
+URL (DigestSet), or a fixed-size Bloom filter of about 2.4 bytes per URL
+(BloomFilter) when even that is too much for a multi-million URL crawl.
+With a state file progress is checkpointed every `checkpoint_every` pages
+and on interrupt: the changes since the last checkpoint (URLs seen, pages
+done, site map offset) are appended to a journal next to it, and a full
+snapshot of the frontier and visited set is only rewritten once the journal
+is as large as the visited set. A later run with the same state file
+resumes where the last one stopped.
+
+    python -m harspylib.xlinkscraper.xlinkscraper --crawl --url https://docs.example.com \\
+        --xpath "//nav" --filename docs --crawl-depth 5 --max-pages 20000 --state docs.crawl
+"""
+import asyncio
+import bisect
+import hashlib
+import heapq
+import math
+import os
+import pickle
+import tempfile
+from array import array
+from collections import deque
+from urllib.parse import parse_qsl, urldefrag, urlencode, urlsplit, urlunsplit
+
+STATE_VERSION = 2
+DEFAULT_PORTS = {"http": 80, "https": 443}
+SKIP_EXTENSIONS = (".pdf", ".zip", ".gz", ".tar", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico",
+                   ".css", ".js", ".json", ".xml", ".mp4", ".mp3", ".woff", ".woff2", ".ttf", ".exe", ".dmg")
+
+
+def canonicalize_url(url):
+    """
+    Canonical form used for dedup: lower-case scheme and host, no default
+    port, no fragment, no trailing slash (except the root), sorted query.
+    Returns None for non-HTTP(S) URLs.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def url_digest(url, size=8):
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=size).digest()
+
+
+class DigestSet:
+    """
+    Exact visited set of 64-bit URL digests: a sorted array (8 bytes per URL)
+    plus a small set of recent additions that is merged into it when it
+    grows past 1/8 of the array, so memory stays around 10-17 bytes per URL.
+    """
+
+    def __init__(self):
+        self._sorted = array("Q")
+        self._pending = set()
+
+    @staticmethod
+    def _key(url):
+        return int.from_bytes(url_digest(url), "big")
+
+    def _has(self, key):
+        if key in self._pending:
+            return True
+        i = bisect.bisect_left(self._sorted, key)
+        return i < len(self._sorted) and self._sorted[i] == key
+
+    def _merge(self):
+        self._sorted = array("Q", heapq.merge(self._sorted, sorted(self._pending)))
+        self._pending = set()
+
+    def add(self, url):
+        """Add `url`; True if it was not seen before."""
+        key = self._key(url)
+        if self._has(key):
+            return False
+        self._pending.add(key)
+        if len(self._pending) >= max(1 << 16, len(self._sorted) >> 3):
+            self._merge()
+        return True
+
+    def __contains__(self, url):
+        return self._has(self._key(url))
+
+    def __len__(self):
+        return len(self._sorted) + len(self._pending)
+
+    def __getstate__(self):
+        if self._pending:
+            self._merge()
+        return {"sorted": self._sorted}
+
+    def __setstate__(self, state):
+        self._sorted = state["sorted"]
+        self._pending = set()
+
+
+class BloomFilter:
+    """
+    Fixed-size visited set: about 2.4 bytes per URL at a 1e-4 false positive
+    rate (1.2 bytes at 1e-2). A false positive means a page is skipped, never
+    fetched twice.
+    """
+
+    def __init__(self, capacity, error_rate=1e-4):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, url):
+        digest = url_digest(url, 16)
+        h1, h2 = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, url):
+        new = False
+        for pos in self._positions(url):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self._array[byte] & mask:
+                self._array[byte] |= mask
+                new = True
+        self._count += new
+        return new
+
+    def __contains__(self, url):
+        return all(self._array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(url))
+
+    def __len__(self):
+        return self._count
+
+
+class SiteCrawler:
+    """BFS crawl over a StaticFetcher; see module docstring."""
+
+    def __init__(self, fetcher, max_depth=3, max_pages=None, visited=None, sitemap_path=None,
+                 state_path=None, checkpoint_every=1000):
+        self.fetcher = fetcher
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.visited = visited if visited is not None else DigestSet()
+        self.sitemap_path = sitemap_path
+        self.state_path = state_path
+        self.checkpoint_every = checkpoint_every
+        self.frontier = deque()   # (url as linked, depth)
+        self.hosts = set()
+        self.pages = 0
+        self.failed = 0
+        self.sitemap_offset = 0
+        self._in_flight = {}
+        self._sitemap = None
+        self._generation = None   # of the snapshot at state_path; None until one is written
+        self._events = []         # state changes since the last journal record
+        self._journaled = 0       # events in the journal since the snapshot
+
+    # ---- state ----
+    @staticmethod
+    def journal_path(state_path):
+        return state_path + ".log"
+
+    @classmethod
+    def resume(cls, state_path, fetcher, max_depth=3, max_pages=None, sitemap_path=None, checkpoint_every=1000):
+        """Rebuild a crawler from the snapshot written by save() plus the journal written by checkpoint()."""
+        with open(state_path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported crawl state version in {state_path}")
+        crawler = cls(fetcher, max_depth=max_depth, max_pages=max_pages, visited=state["visited"],
+                      sitemap_path=sitemap_path, state_path=state_path, checkpoint_every=checkpoint_every)
+        crawler.hosts = set(state["hosts"])
+        crawler.pages = state["pages"]
+        crawler.failed = state["failed"]
+        crawler.sitemap_offset = state["sitemap_offset"]
+        crawler._generation = state["generation"]
+        crawler.frontier = deque(crawler._replay(state["frontier"]))
+        return crawler
+
+    def _replay(self, frontier):
+        """Apply the journal records of the current snapshot generation; returns the frontier."""
+        queued, done = list(frontier), set()
+        path = self.journal_path(self.state_path)
+        if not os.path.exists(path):
+            return queued
+        good = 0
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    generation, sitemap_offset, events = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, ValueError, TypeError):
+                    break   # end of file, or a record torn by a crash
+                good = f.tell()
+                if generation != self._generation:
+                    continue
+                self.sitemap_offset = sitemap_offset
+                self._journaled += len(events)
+                for event in events:
+                    kind = event[0]
+                    if kind == "seen":
+                        _, canonical, url, depth = event
+                        self.visited.add(canonical)
+                        if depth is not None:
+                            queued.append((url, depth))
+                    elif kind == "done":
+                        done.add(event[1])
+                        self.pages += 1
+                        self.failed += not event[2]
+                    elif kind == "host":
+                        self.hosts.add(event[1])
+        with open(path, "r+b") as f:
+            f.truncate(good)
+        return [(url, depth) for url, depth in queued if url not in done]
+
+    def save(self, path=None):
+        """
+        Write a full snapshot atomically (pages in flight go back to the front
+        of the frontier). Saving to state_path starts a new journal.
+        """
+        path = path or self.state_path
+        if self._sitemap is not None:
+            self._sitemap.flush()
+            self.sitemap_offset = self._sitemap.tell()
+        compacting = path == self.state_path
+        generation = (self._generation or 0) + 1 if compacting else self._generation
+        state = {
+            "version": STATE_VERSION,
+            "generation": generation,
+            "frontier": list(self._in_flight.values()) + list(self.frontier),
+            "visited": self.visited,
+            "hosts": sorted(self.hosts),
+            "pages": self.pages,
+            "failed": self.failed,
+            "sitemap_offset": self.sitemap_offset,
+        }
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        if compacting:
+            # Journal records of older generations are ignored, so a crash before this is harmless
+            self._generation = generation
+            self._events, self._journaled = [], 0
+            with open(self.journal_path(path), "wb"):
+                pass
+        return path
+
+    def checkpoint(self):
+        """
+        Persist progress to state_path. Usually this appends the changes since
+        the last checkpoint to the journal, which costs O(changes); a full
+        snapshot is written first time and once the journal has grown as
+        large as the visited set, so snapshot cost stays amortized O(1) per URL.
+        """
+        if not self.state_path:
+            return
+        if self._generation is None or self._journaled + len(self._events) > max(len(self.visited), 10000):
+            self.save()
+            return
+        if self._sitemap is not None:
+            self._sitemap.flush()
+            self.sitemap_offset = self._sitemap.tell()
+        with open(self.journal_path(self.state_path), "ab") as f:
+            pickle.dump((self._generation, self.sitemap_offset, self._events), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journaled += len(self._events)
+        self._events = []
+
+    # ---- discovery ----
+    def add_seeds(self, urls):
+        for url in urls:
+            canonical = canonicalize_url(url)
+            if canonical is None:
+                print(f"⚠️ Skipping non-HTTP seed: {url}")
+                continue
+            host = urlsplit(canonical).netloc
+            if host not in self.hosts:
+                self.hosts.add(host)
+                self._events.append(("host", host))
+            if self.visited.add(canonical):
+                url = urldefrag(url.strip())[0]
+                self.frontier.append((url, 0))
+                self._events.append(("seen", canonical, url, 0))
+                self._record(url, url)
+
+    def _record(self, text, url):
+        if self._sitemap is not None:
+            self._sitemap.write(f"- [{text}]({url})\n")
+
+    def _discover(self, links, depth):
+        for text, resolved, _ in links:
+            canonical = canonicalize_url(resolved)
+            if canonical is None or urlsplit(canonical).netloc not in self.hosts:
+                continue
+            if canonical.lower().endswith(SKIP_EXTENSIONS) or not self.visited.add(canonical):
+                continue
+            url = urldefrag(resolved)[0]   # the canonical form is only the dedup key
+            self._record(text, url)
+            queued = self.max_depth is None or depth + 1 <= self.max_depth
+            if queued:
+                self.frontier.append((url, depth + 1))
+            self._events.append(("seen", canonical, url, depth + 1 if queued else None))
+
+    # ---- crawl ----
+    def _open_sitemap(self):
+        if not self.sitemap_path:
+            return None
+        if self.sitemap_offset and os.path.exists(self.sitemap_path):
+            # Drop anything written after the last checkpoint; it will be rediscovered
+            f = open(self.sitemap_path, "r+", encoding="utf-8")
+            f.seek(self.sitemap_offset)
+            f.truncate()
+            return f
+        return open(self.sitemap_path, "w", encoding="utf-8")
+
+    def _budget_left(self):
+        return self.max_pages is None or self.pages + len(self._in_flight) < self.max_pages
+
+    async def crawl(self, on_page=None):
+        """Run until the frontier is empty or the page budget is spent; on_page(result, depth) per page."""
+        gate = asyncio.Semaphore(self.fetcher.concurrency)
+        window = self.fetcher.concurrency * 2
+        since_checkpoint = 0
+        async with self.fetcher.client() as client:
+            pending = {}
+            try:
+                while True:
+                    while self.frontier and len(pending) < window and self._budget_left():
+                        url, depth = self.frontier.popleft()
+                        fut = asyncio.ensure_future(self.fetcher.fetch(client, url, gate))
+                        pending[fut] = depth
+                        self._in_flight[fut] = (url, depth)
+                    if not pending:
+                        break
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for fut in done:
+                        depth = pending.pop(fut)
+                        url, _ = self._in_flight.pop(fut)
+                        result = fut.result()
+                        self.pages += 1
+                        self._events.append(("done", url, result.ok))
+                        if result.ok:
+                            self._discover(result.links, depth)
+                        else:
+                            self.failed += 1
+                        if on_page is not None:
+                            on_page(result, depth)
+                    since_checkpoint += len(done)
+                    if self.state_path and since_checkpoint >= self.checkpoint_every:
+                        self.checkpoint()
+                        since_checkpoint = 0
+            finally:
+                for fut in pending:
+                    fut.cancel()
+
+    def run(self, seeds=(), on_page=None):
+        """Blocking crawl from `seeds` (plus any resumed frontier). Checkpoints on exit if state_path is set."""
+        self._sitemap = self._open_sitemap()
+        try:
+            self.add_seeds(seeds)
+            asyncio.run(self.crawl(on_page))
+        finally:
+            self.checkpoint()
+            if self._sitemap is not None:
+                self._sitemap.close()
+                self._sitemap = None
+        return self
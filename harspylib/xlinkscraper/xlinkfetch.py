@@ -0,0 +1,215 @@
+"""
+xlinkfetch.py
+-------------
+Concurrent static-mode link extraction for many URLs.
+
+Pages are fetched through one pooled httpx.AsyncClient, so keep-alive
+connections are reused across pages of the same host, with
+  - a global cap on requests in flight and a per-host cap,
+  - an optional per-host rate limit (request starts per second),
+  - retries with exponential backoff and jitter on connection errors,
+    timeouts, 429 and 5xx responses (a numeric Retry-After is honoured),
+  - a per-request timeout.
+Each page goes through extract_links_static (normalize_xpath + clean_text)
+as soon as it arrives, and results are yielded in completion order. With an
+HTTPCache (xlinkcache) fresh pages are served from disk and stale ones are
+revalidated with conditional requests.
+
+    python -m harspylib.xlinkscraper.xlinkscraper --urls-file urls.txt \\
+        --xpath "//nav" --filename docs --concurrency 32 --per-host 4 --rate 5
+"""
+import asyncio
+import contextlib
+import random
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from .xlinkcache import conditional_headers
+from .xlinkparse import extract_links_static
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_BACKOFF = 30.0
+USER_AGENT = "harspylib-xlinkscraper"
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one URL: the links found, or the error after the last attempt."""
+    url: str
+    final_url: Optional[str] = None
+    status: Optional[int] = None
+    links: List[Tuple[str, str, str]] = field(default_factory=list)
+    error: Optional[str] = None
+    attempts: int = 0
+    seconds: float = 0.0
+    cache: Optional[str] = None   # "fresh", "revalidated", "stored" when an HTTPCache was used
+    note: Optional[str] = None    # set by a custom `extract`, e.g. why a page needs a browser
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def read_urls(path):
+    """URLs from a text file, one per line. Blank lines and # comments are skipped, repeats dropped."""
+    seen = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith("#"):
+                seen.setdefault(url, None)
+    return list(seen)
+
+
+def _extract_static(content, base_url, xpath):
+    return extract_links_static(content, base_url, xpath), None
+
+
+class HostLimiter:
+    """Per-host concurrency cap plus an optional minimum spacing between request starts."""
+
+    def __init__(self, per_host=4, rate=None):
+        self.per_host = per_host
+        self.interval = 1.0 / rate if rate else 0.0
+        self._slots = {}
+        self._next_start = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url):
+        host = urlparse(url).netloc.lower()
+        sem = self._slots.get(host)
+        if sem is None:
+            sem = self._slots[host] = asyncio.Semaphore(self.per_host)
+        async with sem:
+            if self.interval:
+                # Reserve the next start time before sleeping; the loop is single-threaded
+                now = asyncio.get_running_loop().time()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.interval
+                if start > now:
+                    await asyncio.sleep(start - now)
+            yield
+
+
+class StaticFetcher:
+    """Fetch many pages concurrently and extract the anchors under `xpath` from each."""
+
+    def __init__(self, xpath, concurrency=16, per_host=4, rate=None, retries=3, backoff=0.5,
+                 timeout=10.0, headers=None, cache=None, extract=None):
+        self.xpath = xpath
+        self.concurrency = concurrency
+        self.limiter = HostLimiter(per_host, rate)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        self.cache = cache
+        # extract(content, base_url, xpath) -> (links, note); runs on a worker thread
+        self.extract = extract or _extract_static
+
+    def client(self):
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        return httpx.AsyncClient(limits=limits, timeout=self.timeout, headers=self.headers,
+                                 follow_redirects=True)
+
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.strip().isdigit():
+            return min(float(retry_after), MAX_BACKOFF)
+        return min(self.backoff * 2 ** attempt, MAX_BACKOFF) * random.uniform(0.5, 1.0)
+
+    async def _get(self, client, url, result, headers=None):
+        """GET with retries; returns the final response (a 304 included) or raises the last error."""
+        for attempt in range(self.retries + 1):
+            result.attempts = attempt + 1
+            response = None
+            try:
+                async with self.limiter.slot(url):
+                    response = await client.get(url, headers=headers)
+                if response.status_code == 304:
+                    return response
+                if response.status_code not in RETRY_STATUS or attempt == self.retries:
+                    response.raise_for_status()
+                    return response
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if isinstance(e, httpx.HTTPStatusError) or attempt == self.retries:
+                    raise
+            await asyncio.sleep(self._delay(attempt, response))
+
+    async def _text(self, client, url, result, gate):
+        """Page body for `url`, through the cache when there is one."""
+        page = None
+        if self.cache is not None:
+            page, fresh = self.cache.lookup(url)
+            if fresh:
+                result.status, result.final_url, result.cache = 200, page.final_url, "fresh"
+                return page.text
+        async with gate or contextlib.AsyncExitStack():
+            response = await self._get(client, url, result, conditional_headers(page))
+        result.status = response.status_code
+        result.final_url = str(response.url)
+        if self.cache is None:
+            return response.text
+        page = self.cache.update(url, response.status_code, response.headers, response.content,
+                                 result.final_url, response.encoding, stale=page)
+        if page is None:
+            return response.text
+        result.final_url = page.final_url
+        result.cache = "revalidated" if response.status_code == 304 else "stored"
+        return page.text
+
+    async def fetch(self, client, url, gate=None):
+        result = FetchResult(url)
+        t0 = time.perf_counter()
+        try:
+            text = await self._text(client, url, result, gate)
+            # lxml parsing releases the GIL, so it overlaps with other downloads
+            loop = asyncio.get_running_loop()
+            result.links, result.note = await loop.run_in_executor(None, self.extract, text,
+                                                                   result.final_url, self.xpath)
+        except httpx.HTTPStatusError as e:
+            result.status = e.response.status_code
+            result.error = f"HTTP {e.response.status_code}"
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        result.seconds = time.perf_counter() - t0
+        return result
+
+    async def iter_results(self, urls):
+        """Yield a FetchResult per URL in completion order; at most a few windows of tasks exist at once."""
+        urls = iter(urls)
+        gate = asyncio.Semaphore(self.concurrency)
+        window = self.concurrency * 4
+        async with self.client() as client:
+            pending = set()
+            for url in urls:
+                pending.add(asyncio.ensure_future(self.fetch(client, url, gate)))
+                if len(pending) >= window:
+                    break
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+                    url = next(urls, None)
+                    if url is not None:
+                        pending.add(asyncio.ensure_future(self.fetch(client, url, gate)))
+
+    def run(self, urls, on_result=None):
+        """Blocking wrapper: fetch every URL and return the results in completion order."""
+        async def collect():
+            results = []
+            async for result in self.iter_results(urls):
+                if on_result is not None:
+                    on_result(result)
+                results.append(result)
+            return results
+        return asyncio.run(collect())
+
+
+def fetch_many(urls, xpath, **options):
+    """Extract links under `xpath` from every URL; options are StaticFetcher's."""
+    return StaticFetcher(xpath, **options).run(urls)
@@ -0,0 +1,44 @@
+"""
+xlinkparse.py
+-------------
+Static-mode link extraction with lxml (no Selenium).
+
+Shared by xlinkscraper's static mode, the concurrent fetcher (xlinkfetch),
+the crawler and auto mode, so those paths never import Selenium.
+xlinkscraper re-exports everything here.
+"""
+import re
+from urllib.parse import urljoin
+
+from lxml import html
+
+
+def normalize_xpath(xpath_expr):
+    """Ensure XPath always searches for anchors recursively (static mode only)."""
+    xp = xpath_expr.strip()
+    if not xp.endswith("a") and not xp.endswith("a]"):
+        xp = xp + "//a"
+    elif xp.endswith("/a"):
+        xp = xp[:-2] + "//a"
+    return xp
+
+
+def clean_text(raw_text):
+    """Normalize whitespace in anchor text."""
+    return re.sub(r"\s+", " ", (raw_text or "").strip())
+
+
+def extract_links_static(content, base_url, xpath_expr):
+    """Extract (text, resolved, href) anchor tuples from an HTML document under xpath_expr."""
+    return links_from_tree(html.fromstring(content), base_url, xpath_expr)
+
+
+def links_from_tree(tree, base_url, xpath_expr):
+    """extract_links_static on an already parsed lxml tree."""
+    collected_links = []
+    for a in tree.xpath(normalize_xpath(xpath_expr)):
+        href = a.get("href")
+        if not href:
+            continue
+        collected_links.append((clean_text(a.text_content()), urljoin(base_url, href), href))
+    return collected_links
@@ -0,0 +1,200 @@
+"""
+xlinkpool.py
+------------
+Pool of warm Selenium browsers for dynamic-mode extraction of many URLs.
+
+A DriverPool starts up to `size` Chrome instances on demand and hands them
+out one page at a time. Between pages a browser is reset (extra windows
+closed, cookies, cache and storage cleared, about:blank loaded) instead of
+being quit. A browser is replaced when
+  - it fails the health check on checkout (crashed or hung),
+  - a page failed with a WebDriver error,
+  - it has served `max_pages` pages, or its JS heap is above `max_heap_mb`
+    (Chrome only), to bound slow leaks.
+`extract_links_dynamic_many` schedules URLs across the pool with one worker
+thread per browser.
+
+    python -m harspylib.xlinkscraper.xlinkscraper --dynamic --urls-file urls.txt \\
+        --xpath "//aside" --filename docs --workers 4
+"""
+import contextlib
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from selenium.common.exceptions import WebDriverException
+
+from .xlinkscraper import SETTLE_QUIET, SETTLE_TIMEOUT, extract_links_from_driver, new_chrome_driver
+
+HEALTH_TIMEOUT = 5   # seconds for the checkout health check script
+
+
+class PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.broken = False
+
+
+class DriverPool:
+    """Thread-safe pool of reusable WebDrivers; see module docstring."""
+
+    def __init__(self, size=2, headless=True, max_pages=100, max_heap_mb=1024, factory=None):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_heap_mb = max_heap_mb
+        self.factory = factory or (lambda: new_chrome_driver(headless))
+        self._slots = threading.BoundedSemaphore(size)   # one per browser that may be checked out
+        self._idle = queue.LifoQueue()   # most recently used first: its caches are warm
+        self._all = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"started": 0, "recycled": 0, "pages": 0}
+
+    # ---- lifecycle ----
+    def _start(self):
+        pooled = PooledDriver(self.factory())
+        with self._lock:
+            self._all.add(pooled)
+            self.stats["started"] += 1
+        return pooled
+
+    def _retire(self, pooled, recycled=True):
+        with self._lock:
+            self._all.discard(pooled)
+            if recycled:
+                self.stats["recycled"] += 1
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def _healthy(self, pooled):
+        try:
+            pooled.driver.set_script_timeout(HEALTH_TIMEOUT)
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _worn_out(self, pooled):
+        if self.max_pages and pooled.pages >= self.max_pages:
+            return True
+        if self.max_heap_mb:
+            try:
+                used = pooled.driver.execute_script(
+                    "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : 0")
+            except Exception:
+                return True
+            if used and used > self.max_heap_mb * 1024 * 1024:
+                return True
+        return False
+
+    def _reset(self, pooled):
+        """Bring a browser back to a blank state for the next page."""
+        driver = pooled.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        except Exception:   # not Chrome: current-domain cookies only
+            driver.delete_all_cookies()
+        driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        driver.get("about:blank")
+
+    def _checkout(self):
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    pooled = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._start()
+                if self._healthy(pooled):
+                    return pooled
+                self._retire(pooled)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, pooled):
+        try:
+            with self._lock:
+                self.stats["pages"] += 1
+                closed = self._closed
+            pooled.pages += 1
+            if not closed and not pooled.broken and not self._worn_out(pooled):
+                try:
+                    self._reset(pooled)
+                    self._idle.put(pooled)
+                    return
+                except Exception:
+                    pass
+            self._retire(pooled, recycled=not closed)
+        finally:
+            self._slots.release()
+
+    @contextlib.contextmanager
+    def driver(self):
+        """Borrow a healthy WebDriver for one page."""
+        pooled = self._checkout()
+        try:
+            yield pooled.driver
+        except WebDriverException:
+            pooled.broken = True
+            raise
+        finally:
+            self._checkin(pooled)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            drivers = list(self._all)
+        for pooled in drivers:
+            self._retire(pooled, recycled=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def extract_links_dynamic_many(urls, top_xpath, maxdepth=None, click_xpath=None, pool=None, workers=2,
+                               headless=True, on_result=None, settle_quiet=SETTLE_QUIET,
+                               settle_timeout=SETTLE_TIMEOUT):
+    """
+    Extract links from every URL in parallel over a DriverPool (a new one of
+    `workers` browsers unless `pool` is given). Returns {url: (links, error)}
+    in completion order; on_result(url, links, error) is called as pages finish.
+    """
+    own_pool = pool is None
+    pool = pool or DriverPool(size=workers, headless=headless)
+
+    def one(url):
+        with pool.driver() as driver:
+            return extract_links_from_driver(driver, url, top_xpath, maxdepth, click_xpath,
+                                             settle_quiet, settle_timeout)[0]
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(pool.size) as executor:
+            futures = {executor.submit(one, url): url for url in urls}
+            for fut in as_completed(futures):
+                url = futures[fut]
+                try:
+                    links, error = fut.result(), None
+                except Exception as e:
+                    links, error = [], f"{type(e).__name__}: {e}"
+                results[url] = (links, error)
+                if on_result is not None:
+                    on_result(url, links, error)
+    finally:
+        if own_pool:
+            pool.close()
+    return results
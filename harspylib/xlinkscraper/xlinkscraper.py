@@ -7,8 +7,7 @@ Supports recursive traversal of clickable elements (e.g., buttons) with Selenium
 """
 
 import argparse
-import time
-import re
+import os
 from urllib.parse import urljoin, urlparse
 
 import requests
@@ -19,16 +18,34 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-
-def fetch_static_html(url):
-    """Fetch static HTML using requests."""
-    resp = requests.get(url, timeout=10)
-    resp.raise_for_status()
-    return resp.text
-
-
-def fetch_dynamic_driver(url, headless=True):
-    """Initialize Selenium and return driver with page loaded."""
+from .xlinkcache import HTTPCache, conditional_headers, default_cache
+from .xlinkparse import clean_text, extract_links_static, links_from_tree, normalize_xpath  # noqa: F401
+
+
+def fetch_static_html(url, cache=None):
+    """
+    Fetch static HTML using requests. With an HTTPCache (passed, or configured
+    through XLINK_CACHE_DIR) stored pages are revalidated or served offline.
+    """
+    cache = cache or default_cache()
+    if cache is None:
+        resp = requests.get(url, timeout=10)
+        resp.raise_for_status()
+        return resp.text
+
+    page, fresh = cache.lookup(url)
+    if fresh:
+        return page.text
+    resp = requests.get(url, headers=conditional_headers(page), timeout=10)
+    if resp.status_code != 304:
+        resp.raise_for_status()
+    page = cache.update(url, resp.status_code, resp.headers, resp.content, resp.url,
+                        resp.encoding or resp.apparent_encoding, stale=page)
+    return page.text if page is not None else resp.text
+
+
+def new_chrome_driver(headless=True):
+    """Start a Chrome WebDriver (headless by default) with no page loaded."""
     options = Options()
     if headless:
         options.add_argument("--headless=new")
@@ -36,67 +53,205 @@ def fetch_dynamic_driver(url, headless=True):
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--window-size=1920,1080")  # force desktop layout
-    driver = webdriver.Chrome(options=options)
-    driver.get(url)
+    return webdriver.Chrome(options=options)
 
-    # Ensure page <body> is loaded
-    WebDriverWait(driver, 30).until(
+
+def load_page(driver, url, timeout=30):
+    """Navigate `driver` to url and wait for <body>."""
+    driver.get(url)
+    WebDriverWait(driver, timeout).until(
         EC.presence_of_element_located((By.TAG_NAME, "body"))
     )
     return driver
 
 
-def normalize_xpath(xpath_expr):
-    """Ensure XPath always searches for anchors recursively (static mode only)."""
-    xp = xpath_expr.strip()
-    if not xp.endswith("a") and not xp.endswith("a]"):
-        xp = xp + "//a"
-    elif xp.endswith("/a"):
-        xp = xp[:-2] + "//a"
-    return xp
-
-
-def clean_text(raw_text):
-    """Normalize whitespace in anchor text."""
-    return re.sub(r"\s+", " ", (raw_text or "").strip())
-
-
-def collect_links_and_targets(element, click_xpath=None):
-    """Collect anchors and clickable elements under a Selenium element."""
-    anchors = element.find_elements(By.TAG_NAME, "a")
-    if click_xpath:
-        targets = element.find_elements(By.XPATH, click_xpath)
-    else:
-        targets = element.find_elements(By.TAG_NAME, "button")
-    return anchors, targets
-
+def fetch_dynamic_driver(url, headless=True):
+    """Initialize Selenium and return driver with page loaded."""
+    driver = new_chrome_driver(headless)
+    try:
+        return load_page(driver, url)
+    except Exception:
+        driver.quit()
+        raise
+
+
+# One round trip per harvest: every anchor as [text, href, key] and every
+# clickable as [element, key] under the scope element (arguments[0]).
+# click_xpath (arguments[1]) is evaluated with the scope as context node, as
+# find_elements(By.XPATH) does. With only_new (arguments[2]) anchors returned
+# with an href by an earlier harvest of this page are skipped. Text is the rendered text,
+# or the raw text of a hidden (e.g. collapsed) anchor; href is the resolved
+# URL, like get_attribute("href"). `key` is an id assigned to the element on
+# its first harvest, so it survives label changes and siblings inserted
+# before it. An element the page re-renders (a new node in the place of a
+# detached one) takes over the id of the node it replaces, matched by its
+# tag/index path.
+HARVEST_SCRIPT = """
+const scope = arguments[0], clickXPath = arguments[1], onlyNew = arguments[2];
+const seen = window.__xlinkSeen || (window.__xlinkSeen = new WeakSet());
+const ids = window.__xlinkIds || (window.__xlinkIds = {byElement: new WeakMap(), byPath: new Map(), next: 0});
+const weak = typeof WeakRef === "function" ? el => new WeakRef(el) : el => ({deref: () => el});
+function path(el) {
+    const parts = [];
+    for (let node = el; node && node.nodeType === 1; node = node.parentElement) {
+        let i = 1;
+        for (let sib = node.previousElementSibling; sib; sib = sib.previousElementSibling) {
+            if (sib.tagName === node.tagName) i++;
+        }
+        parts.push(node.tagName.toLowerCase() + "[" + i + "]");
+    }
+    return parts.reverse().join("/");
+}
+function key(el) {
+    const p = path(el), prev = ids.byPath.get(p);
+    const holder = prev && prev.ref.deref();
+    const vacant = !prev || !holder || !holder.isConnected;
+    let id = ids.byElement.get(el);
+    if (id === undefined) {
+        id = prev && vacant ? prev.id : ++ids.next;
+        ids.byElement.set(el, id);
+    }
+    if (vacant || holder === el) ids.byPath.set(p, {id: id, ref: weak(el)});
+    return "#" + id;
+}
+function text(el) {
+    return el.getClientRects().length ? el.innerText : el.textContent;
+}
+const anchors = [];
+for (const a of scope.getElementsByTagName("a")) {
+    const hasHref = a.getAttribute("href") !== null;
+    if (onlyNew) {
+        if (seen.has(a)) continue;
+        if (hasHref) seen.add(a);   // an anchor whose href is set later is returned again
+    }
+    anchors.push([text(a), hasHref ? a.href : null, key(a)]);
+}
+const targets = [];
+if (clickXPath) {
+    const found = document.evaluate(clickXPath, scope, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (let i = 0; i < found.snapshotLength; i++) {
+        const el = found.snapshotItem(i);
+        if (el.nodeType === 1) targets.push([el, key(el)]);
+    }
+} else {
+    for (const b of scope.getElementsByTagName("button")) targets.push([b, key(b)]);
+}
+return [anchors, targets];
+"""
 
-def recursive_traverse(driver, element, base_url, collected_links, visited, maxdepth, click_xpath, scope_xpath):
-    """Recursive DFS traversal of anchors and clickable expanders."""
-    anchors, targets = collect_links_and_targets(element, click_xpath)
+# Waits (async script) until the scope element (arguments[0]; the whole
+# document when null or no longer attached) has had no child/text mutations and no fetch/XHR
+# started during this wait has been pending for `quiet` ms (arguments[1]),
+# or `timeout` ms (arguments[2]) have passed; resolves to true when the page
+# settled. Requests already running when the wait starts (long polling, SSE,
+# beacons) are ignored, as are requests older than `maxRequest` ms
+# (arguments[3]), so a page that is never fully idle is not waited on until
+# the timeout. The first call on a page installs the request hooks.
+SETTLE_SCRIPT = """
+const scope = arguments[0], quiet = arguments[1], timeout = arguments[2], maxRequest = arguments[3];
+const done = arguments[arguments.length - 1];
+let s = window.__xlinkSettle;
+if (!s) {
+    s = window.__xlinkSettle = {active: new Set()};
+    const track = () => { const r = {t: performance.now()}; s.active.add(r); return r; };
+    if (window.fetch) {
+        const fetch0 = window.fetch;
+        window.fetch = function () {
+            const r = track();
+            try {
+                return fetch0.apply(this, arguments).finally(() => s.active.delete(r));
+            } catch (e) {
+                s.active.delete(r);
+                throw e;
+            }
+        };
+    }
+    const send0 = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        const r = track();
+        this.addEventListener("loadend", () => s.active.delete(r));
+        try {
+            return send0.apply(this, arguments);
+        } catch (e) {
+            s.active.delete(r);
+            throw e;
+        }
+    };
+}
+const start = performance.now();
+let last = start;
+const target = scope && scope.isConnected ? scope : document;
+const observer = new MutationObserver(() => { last = performance.now(); });
+observer.observe(target, {childList: true, subtree: true, characterData: true});
+function pending(now) {
+    for (const r of s.active) {
+        if (r.t >= start && now - r.t < maxRequest) return true;
+    }
+    return false;
+}
+(function poll() {
+    const now = performance.now();
+    const settled = !pending(now) && now - last >= quiet;
+    if (settled || now - start >= timeout) {
+        observer.disconnect();
+        return done(settled);
+    }
+    setTimeout(poll, 25);
+})();
+"""
+SETTLE_QUIET = 0.15       # seconds without DOM changes or new pending requests
+SETTLE_TIMEOUT = 3.0      # give up waiting after this many seconds
+SETTLE_MAX_REQUEST = 2.0  # requests pending longer than this stop counting as page updates
+
+
+def wait_for_settle(driver, scope=None, quiet=SETTLE_QUIET, timeout=SETTLE_TIMEOUT):
+    """Block until `scope` (or the page) stops changing (see SETTLE_SCRIPT); False on timeout."""
+    return driver.execute_async_script(SETTLE_SCRIPT, scope, int(quiet * 1000), int(timeout * 1000),
+                                       int(min(SETTLE_MAX_REQUEST, timeout) * 1000))
+
+
+def collect_links_and_targets(element, click_xpath=None, only_new=False):
+    """
+    Collect anchors and clickable elements under a Selenium element in a
+    single execute_script call. Returns anchors as (text, href, key) and
+    targets as (WebElement, key); see HARVEST_SCRIPT.
+    """
+    anchors, targets = element.parent.execute_script(HARVEST_SCRIPT, element, click_xpath, only_new)
+    return [tuple(a) for a in anchors], [tuple(t) for t in targets]
+
+
+def recursive_traverse(driver, element, base_url, collected_links, visited, maxdepth, click_xpath, scope_xpath,
+                       settle_quiet=SETTLE_QUIET, settle_timeout=SETTLE_TIMEOUT):
+    """
+    Recursive DFS traversal of anchors and clickable expanders. `visited`
+    holds the keys of anchors collected and targets clicked so far, so each
+    is handled once even after the page re-renders it, and every pass only
+    collects anchors that appeared since the previous one. After each click
+    the traversal waits for the container to settle (see wait_for_settle).
+    """
+    anchors, targets = collect_links_and_targets(element, click_xpath, only_new=True)
 
     # Collect anchors
-    for a in anchors:
-        href = a.get_attribute("href")
-        text = clean_text(a.text)
-        if not href:
+    for raw_text, href, key in anchors:
+        if not href or key in visited:
             continue
+        visited.add(key)
         resolved = urljoin(base_url, href)
-        collected_links.append((text, resolved, href))
+        collected_links.append((clean_text(raw_text), resolved, href))
 
     # Process clickable elements
-    for tgt in targets:
-        if tgt in visited:
+    for tgt, key in targets:
+        if key in visited:
             continue
-        visited.add(tgt)
+        visited.add(key)
 
         try:
             driver.execute_script("arguments[0].scrollIntoView(true);", tgt)
             tgt.click()
-            time.sleep(1)  # allow DOM update
         except Exception as e:
             print(f"⚠️ Could not click element: {e}")
             continue
+        wait_for_settle(driver, element, settle_quiet, settle_timeout)  # allow DOM update
 
         # Re-scope to original container
         try:
@@ -114,37 +269,58 @@ def recursive_traverse(driver, element, base_url, collected_links, visited, maxd
                 maxdepth=maxdepth,
                 click_xpath=click_xpath,
                 scope_xpath=scope_xpath,
+                settle_quiet=settle_quiet,
+                settle_timeout=settle_timeout,
             )
 
 
-def extract_links_dynamic(url, top_xpath, maxdepth=None, click_xpath=None, headless=True):
-    """Extract links recursively from a dynamic page starting at top_xpath."""
-    driver = fetch_dynamic_driver(url, headless=headless)
-
-    try:
-        elements = driver.find_elements(By.XPATH, top_xpath)
-        if not elements:
-            print(f"⚠️ No elements found for XPath: {top_xpath}")
-            return [], []
+def extract_links_from_driver(driver, url, top_xpath, maxdepth=None, click_xpath=None,
+                              settle_quiet=SETTLE_QUIET, settle_timeout=SETTLE_TIMEOUT):
+    """Load url in an existing driver and extract links recursively starting at top_xpath."""
+    load_page(driver, url)
+    driver.set_script_timeout(settle_timeout + 5)
+    # installs the request hooks and lets client rendering finish
+    wait_for_settle(driver, None, settle_quiet, settle_timeout)
+    elements = driver.find_elements(By.XPATH, top_xpath)
+    if not elements:
+        print(f"⚠️ No elements found for XPath: {top_xpath}")
+        return [], []
+
+    collected_links = []
+    visited = set()
+
+    for element in elements:
+        recursive_traverse(
+            driver,
+            element,
+            url,
+            collected_links,
+            visited,
+            maxdepth=maxdepth,
+            click_xpath=click_xpath,
+            scope_xpath=top_xpath,
+            settle_quiet=settle_quiet,
+            settle_timeout=settle_timeout,
+        )
 
-        collected_links = []
-        visited = set()
+    relative_links = make_relative_links(collected_links, url)
+    return collected_links, relative_links
 
-        for element in elements:
-            recursive_traverse(
-                driver,
-                element,
-                url,
-                collected_links,
-                visited,
-                maxdepth=maxdepth,
-                click_xpath=click_xpath,
-                scope_xpath=top_xpath,
-            )
 
-        relative_links = make_relative_links(collected_links, url)
-        return collected_links, relative_links
+def extract_links_dynamic(url, top_xpath, maxdepth=None, click_xpath=None, headless=True, pool=None,
+                          settle_quiet=SETTLE_QUIET, settle_timeout=SETTLE_TIMEOUT):
+    """
+    Extract links recursively from a dynamic page starting at top_xpath. With
+    a DriverPool (xlinkpool) a warm browser is borrowed instead of starting one.
+    """
+    settle = dict(settle_quiet=settle_quiet, settle_timeout=settle_timeout)
+    if pool is not None:
+        with pool.driver() as driver:
+            return extract_links_from_driver(driver, url, top_xpath, maxdepth, click_xpath, **settle)
 
+    driver = new_chrome_driver(headless)
+    try:
+        return extract_links_from_driver(driver, url, top_xpath, maxdepth, click_xpath, **settle)
     finally:
         driver.quit()
 
@@ -179,45 +355,201 @@ def write_markdown_files(collected_links, relative_links, base_url, filename_pre
     print(f"   → {rel_md} (base + relative URLs)")
 
 
+def extract_links_many(args):
+    """
+    --urls-file (plus --url), or --auto: static pages are fetched
+    concurrently (see xlinkfetch), dynamic ones spread over a pool of warm
+    browsers (see xlinkpool), and --auto tries static first (see xlinkauto).
+    Returns (collected_links, relative_links, base_url).
+    """
+    from .xlinkfetch import StaticFetcher, read_urls
+
+    urls = read_urls(args.urls_file) if args.urls_file else []
+    if args.url and args.url not in urls:
+        urls.insert(0, args.url)
+
+    def report(url, error, attempts=None):
+        if error:
+            print(f"⚠️ {url}: {error}" + (f" (after {attempts} attempts)" if attempts else ""))
+
+    if args.auto:
+        from .xlinkauto import extract_links_auto
+
+        def report_path(result):
+            detail = result.error or result.reason or f"{len(result.links)} links"
+            print(f"  {result.path:<8} {result.url}  ({detail})")
+
+        fetcher = StaticFetcher(args.xpath, concurrency=args.concurrency, per_host=args.per_host, rate=args.rate,
+                                retries=args.retries, timeout=args.timeout, cache=args.cache)
+        done = extract_links_auto(urls, args.xpath, args.min_links, fetcher, args.maxdepth, args.clickxpath,
+                                  workers=args.workers, headless=not args.no_headless, on_result=report_path,
+                                  settle_quiet=args.settle_quiet, settle_timeout=args.settle_timeout)
+        results = {url: (r.links, r.base_url or url, r.error) for url, r in done.items()}
+        dynamic = sum(r.path == "dynamic" for r in done.values())
+        print(f"Paths: {len(done) - dynamic} static, {dynamic} dynamic")
+    elif args.dynamic:
+        from .xlinkpool import extract_links_dynamic_many
+
+        done = extract_links_dynamic_many(urls, args.xpath, args.maxdepth, args.clickxpath, workers=args.workers,
+                                          headless=not args.no_headless,
+                                          on_result=lambda url, links, error: report(url, error),
+                                          settle_quiet=args.settle_quiet, settle_timeout=args.settle_timeout)
+        results = {url: (links, url, error) for url, (links, error) in done.items()}
+    else:
+        fetcher = StaticFetcher(args.xpath, concurrency=args.concurrency, per_host=args.per_host, rate=args.rate,
+                                retries=args.retries, timeout=args.timeout, cache=args.cache)
+        done = fetcher.run(urls, on_result=lambda r: report(r.url, r.error, r.attempts))
+        results = {r.url: (r.links, r.final_url or r.url, r.error) for r in done}
+
+    collected_links, relative_links = [], set()
+    for url in urls:   # input order, whatever order the pages arrived in
+        links, base_url, _ = results[url]
+        collected_links.extend(links)
+        relative_links.update(make_relative_links(links, base_url))
+    ok = sum(error is None for _, _, error in results.values())
+    print(f"Fetched {ok}/{len(urls)} pages")
+    return collected_links, sorted(relative_links), urls[0] if urls else None
+
+
+def crawl_site(args):
+    """--crawl: BFS over the seeds' hosts (see xlinkcrawl); writes both markdown files itself."""
+    from .xlinkcrawl import BloomFilter, SiteCrawler
+    from .xlinkfetch import StaticFetcher, read_urls
+
+    seeds = ([args.url] if args.url else []) + (read_urls(args.urls_file) if args.urls_file else [])
+    fetcher = StaticFetcher(args.xpath, concurrency=args.concurrency, per_host=args.per_host, rate=args.rate,
+                            retries=args.retries, timeout=args.timeout, cache=args.cache)
+    full_md = args.filename + "_full.md"
+    options = dict(max_depth=args.crawl_depth, max_pages=args.max_pages, sitemap_path=full_md)
+    if args.state and os.path.exists(args.state):
+        crawler = SiteCrawler.resume(args.state, fetcher, **options)
+        print(f"Resuming crawl: {crawler.pages} pages done, {len(crawler.frontier)} queued")
+    else:
+        visited = BloomFilter(args.bloom) if args.bloom else None
+        crawler = SiteCrawler(fetcher, visited=visited, state_path=args.state, **options)
+
+    def report(result, depth):
+        if not result.ok:
+            print(f"⚠️ {result.url}: {result.error}")
+        elif crawler.pages % 100 == 0:
+            print(f"  {crawler.pages} pages, {len(crawler.visited)} discovered, {len(crawler.frontier)} queued")
+
+    try:
+        crawler.run(seeds, on_page=report)
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted" + (f"; progress saved to {args.state}" if args.state else ""))
+
+    with open(full_md, encoding="utf-8") as f:
+        pages = [line.rstrip("\n").rsplit("](", 1)[1][:-1] for line in f if line.startswith("- [")]
+    base_url = args.url or (seeds[0] if seeds else pages[0] if pages else "")
+    relative_links = make_relative_links([(None, url, None) for url in pages], base_url)
+    rel_md = args.filename + "_relative.md"
+    with open(rel_md, "w", encoding="utf-8") as f:
+        f.write(f"Base URL: {base_url}\n\n")
+        f.write("\n".join(f"- {rel}" for rel in relative_links))
+
+    print(f"✅ Crawled {crawler.pages} pages ({crawler.failed} failed), {len(pages)} pages in site map")
+    if crawler.frontier:
+        print(f"   {len(crawler.frontier)} pages left in the frontier" +
+              (f" (resume with --state {args.state})" if args.state else ""))
+    print(f"   → {full_md} (anchors + full URLs)")
+    print(f"   → {rel_md} (base + relative URLs)")
+
+
+def report_cache(cache):
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Cache: {stats['fresh_hits']} fresh, {stats['revalidated']} not modified (304), "
+              f"{stats['misses']} downloaded")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="xlinkscraper: Extract anchor links from static or dynamic web pages using XPath. "
                     "Supports recursive traversal of clickable elements at any depth."
     )
-    parser.add_argument("--url", "-u", required=True, help="Web page URL to fetch")
+    parser.add_argument("--url", "-u", help="Web page URL to fetch")
+    parser.add_argument("--urls-file", help="Text file of URLs (one per line), processed concurrently")
     parser.add_argument("--xpath", "-x", required=True, help="Top-level XPath container")
     parser.add_argument("--filename", "-f", required=True, help="Prefix for output markdown files")
     parser.add_argument("--dynamic", "-d", action="store_true", help="Enable dynamic mode with Selenium")
+    parser.add_argument("--auto", "-a", action="store_true",
+                        help="Try a static fetch first and use Selenium only for pages that need it")
+    parser.add_argument("--min-links", type=int, default=1,
+                        help="With --auto, fall back to Selenium below this many static anchors (default: 1)")
     parser.add_argument("--maxdepth", "-m", type=int, default=None,
                         help="Maximum recursion depth per subtree (default: unlimited)")
     parser.add_argument("--clickxpath", "-c",
                         help="XPath to identify clickable elements (default: <button>)")
     parser.add_argument("--no-headless", action="store_true", help="Run Selenium with a visible browser window")
+    parser.add_argument("--workers", "-w", type=int, default=2,
+                        help="Browsers kept warm for --dynamic with --urls-file (default: 2)")
+    parser.add_argument("--settle-quiet", type=float, default=SETTLE_QUIET,
+                        help=f"Dynamic mode: seconds without DOM changes that count as settled "
+                             f"(default: {SETTLE_QUIET})")
+    parser.add_argument("--settle-timeout", type=float, default=SETTLE_TIMEOUT,
+                        help=f"Dynamic mode: max seconds to wait for the page to settle after a click "
+                             f"(default: {SETTLE_TIMEOUT})")
+
+    fetch = parser.add_argument_group("concurrent static fetching (--urls-file without --dynamic)")
+    fetch.add_argument("--concurrency", type=int, default=16, help="Requests in flight (default: 16)")
+    fetch.add_argument("--per-host", type=int, default=4, help="Requests in flight per host (default: 4)")
+    fetch.add_argument("--rate", type=float, default=None, help="Max requests per second per host (default: unlimited)")
+    fetch.add_argument("--retries", type=int, default=3, help="Retries on errors, 429 and 5xx (default: 3)")
+    fetch.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds (default: 10)")
+
+    crawl = parser.add_argument_group("same-site crawling (--crawl, uses the options above)")
+    crawl.add_argument("--crawl", action="store_true",
+                       help="Follow same-site links breadth-first from --url/--urls-file")
+    crawl.add_argument("--crawl-depth", type=int, default=3, help="Max link hops from the seeds (default: 3)")
+    crawl.add_argument("--max-pages", type=int, default=None, help="Stop after fetching this many pages")
+    crawl.add_argument("--state", help="Checkpoint file; an existing one is resumed")
+    crawl.add_argument("--bloom", type=int, default=None, metavar="CAPACITY",
+                       help="Track visited URLs in a Bloom filter sized for CAPACITY URLs (default: exact digests)")
+
+    cache = parser.add_argument_group("HTTP cache (static modes)")
+    cache.add_argument("--cache-dir", default=os.environ.get("XLINK_CACHE_DIR"),
+                       help="Cache pages here and revalidate them with conditional requests "
+                            "(default: $XLINK_CACHE_DIR, off when unset)")
+    cache.add_argument("--cache-ttl", type=float, default=0,
+                       help="Seconds a cached page is used without revalidating (default: 0)")
+    cache.add_argument("--cache-max-age", type=float, default=None,
+                       help="Evict pages unused for this many seconds (default: never)")
+    cache.add_argument("--cache-mb", type=float, default=512, help="Cache size limit in MB (default: 512)")
+    cache.add_argument("--offline", action="store_true", help="Serve only from --cache-dir, never fetch")
 
     args = parser.parse_args()
-
-    if args.dynamic:
+    if args.offline and not args.cache_dir:
+        parser.error("--offline needs --cache-dir")
+    args.cache = None
+    if args.cache_dir:
+        args.cache = HTTPCache(args.cache_dir, ttl=args.cache_ttl, max_age=args.cache_max_age,
+                               max_bytes=int(args.cache_mb * 1024 * 1024), offline=args.offline)
+    if not args.url and not args.urls_file and not (args.crawl and args.state):
+        parser.error("one of --url or --urls-file is required")
+
+    if args.auto and args.dynamic:
+        parser.error("--auto and --dynamic are mutually exclusive")
+    if args.crawl:
+        if args.dynamic or args.auto:
+            parser.error("--crawl works in static mode only")
+        crawl_site(args)
+        report_cache(args.cache)
+        return
+    if args.urls_file or args.auto:
+        collected_links, relative_links, args.url = extract_links_many(args)
+    elif args.dynamic:
         collected_links, relative_links = extract_links_dynamic(
-            args.url, args.xpath, args.maxdepth, args.clickxpath, headless=not args.no_headless
+            args.url, args.xpath, args.maxdepth, args.clickxpath, headless=not args.no_headless,
+            settle_quiet=args.settle_quiet, settle_timeout=args.settle_timeout
         )
     else:
         # Static scrape
-        content = fetch_static_html(args.url)
-        tree = html.fromstring(content)
-        xpath_normalized = normalize_xpath(args.xpath)
-        anchors = tree.xpath(xpath_normalized)
-
-        collected_links = []
-        for a in anchors:
-            href = a.get("href")
-            text = clean_text(a.text_content())
-            if not href:
-                continue
-            resolved = urljoin(args.url, href)
-            collected_links.append((text, resolved, href))
-
+        content = fetch_static_html(args.url, cache=args.cache)
+        collected_links = extract_links_static(content, args.url, args.xpath)
         relative_links = make_relative_links(collected_links, args.url)
 
+    report_cache(args.cache)
     if collected_links:
         write_markdown_files(collected_links, relative_links, args.url, args.filename)
     else:
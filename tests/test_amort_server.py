@@ -0,0 +1,121 @@
+"""
+PlanServer end to end over localhost: a thread-pool server on an ephemeral
+port, driven with raw HTTP/1.1 requests (no network access needed).
+"""
+import asyncio
+import json
+
+import pytest
+
+from harspylib.amort import amort_server
+from harspylib.amort.amort_server import PlanServer
+
+CARDS = [
+    {"Card": "Visa", "Balance": 1000, "APR": 18.2, "Min_Override": 0, "Min_Pct": 2},
+    {"Card": "MasterCard", "Balance": 5000, "APR": 24.9, "Min_Override": 100, "Min_Pct": 0},
+]
+
+
+async def _exchange(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return data
+
+
+def _request(method, path, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    return (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n"
+            .encode("latin-1") + data)
+
+
+def _parse(data):
+    """(status, headers, body bytes) of a response; chunked bodies are de-chunked."""
+    head, _, body = data.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:])}
+    if headers.get("transfer-encoding") == "chunked":
+        out = b""
+        while True:
+            size, _, body = body.partition(b"\r\n")
+            size = int(size, 16)
+            if not size:
+                break
+            out, body = out + body[:size], body[size + 2:]
+        body = out
+    return status, headers, body
+
+
+@pytest.fixture
+def send():
+    """send(raw bytes) -> (status, headers, body) against a fresh PlanServer on localhost."""
+    loop = asyncio.new_event_loop()
+    plan_server = PlanServer(processes=2, chunk_size=2, use_threads=True)
+    server = loop.run_until_complete(asyncio.start_server(plan_server.handle, "127.0.0.1", 0))
+    port = server.sockets[0].getsockname()[1]
+    yield lambda raw: _parse(loop.run_until_complete(_exchange(port, raw)))
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    plan_server.close()
+    loop.close()
+
+
+def test_health(send):
+    status, _, body = send(_request("GET", "/health"))
+    assert status == 200
+    assert json.loads(body) == {"status": "ok"}
+
+
+def test_plan(send):
+    status, headers, body = send(_request("POST", "/plan", {"id": "a", "max": 1000, "cards": CARDS}))
+    assert status == 200
+    assert headers["content-type"] == "application/json"
+    result = json.loads(body)
+    assert result["id"] == "a" and result["status"] == "ok"
+    assert result["months"] > 0 and result["total_interest"] > 0
+    assert [row["Card"] for row in result["summary"]] == ["Visa", "MasterCard"]
+
+
+def test_batch_streams_one_line_per_portfolio(send):
+    portfolios = [{"id": i, "max": 800 + 100 * i, "cards": CARDS} for i in range(5)]
+    portfolios.append({"id": "bad", "max": 1000, "cards": "not a list"})
+    portfolios.append({"id": "no-max", "cards": CARDS})
+    status, headers, body = send(_request("POST", "/batch", {"portfolios": portfolios}))
+    assert status == 200
+    assert headers["content-type"] == "application/x-ndjson"
+    results = {r["id"]: r for r in map(json.loads, body.decode("utf-8").splitlines())}
+    assert sorted(results, key=str) == sorted((p["id"] for p in portfolios), key=str)
+    assert all(results[i]["status"] == "ok" for i in range(5))
+    assert results["bad"]["status"] == "error" and "cards" in results["bad"]["error"]
+    assert results["no-max"]["status"] == "error" and "max" in results["no-max"]["error"]
+
+
+def test_malformed_request_line(send):
+    status, _, body = send(b"NOT-HTTP\r\n\r\n")
+    assert status == 400
+    assert "error" in json.loads(body)
+
+
+def test_invalid_content_length(send):
+    status, _, _ = send(b"POST /plan HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+    assert status == 400
+
+
+def test_oversized_body(send, monkeypatch):
+    monkeypatch.setattr(amort_server, "MAX_BODY", 64)
+    status, _, body = send(_request("POST", "/plan", {"id": "big", "max": 1000, "cards": CARDS}))
+    assert status == 413
+    assert "error" in json.loads(body)
+
+
+def test_unknown_path_and_method(send):
+    assert send(_request("POST", "/nope", {}))[0] == 404
+    assert send(_request("GET", "/plan"))[0] == 405
+
+
+def test_invalid_json(send):
+    raw = b"POST /plan HTTP/1.1\r\nContent-Length: 5\r\n\r\n{oops"
+    assert send(raw)[0] == 400
@@ -0,0 +1,117 @@
+"""
+Compatibility of the htmlscraper parser backends: "lxml" and "stream" must
+produce the same links as the "bs4" reference.
+"""
+import pytest
+
+from harspylib.htmlscraper import htmlscraper
+from harspylib.htmlscraper.htmlscraper import check_parsers, extract_links, extract_links_from_file
+
+FAST_PARSERS = ["lxml", "stream"]
+
+DOCUMENT = """<!DOCTYPE html>
+<html>
+<head>
+  <title>Export</title>
+  <base href="https://docs.example.com/guide/">
+  <script>var a = '<a href="/not-a-link">x</a>';</script>
+  <style>a::after { content: "style text"; }</style>
+</head>
+<body>
+  <nav>
+    <a href="/root">Root <!-- hidden comment -->page</a>
+    <a href="intro.html">Intro<script>document.write("script text")</script></a>
+    <a href="../api/#section">API &amp; reference&nbsp;&mdash; caf&eacute; &#x263A;</a>
+    <a href="https://other.example.org/x">External</a>
+    <a href="chapter?id=1&amp;lang=en"><ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby> ruby</a>
+    <a href="   spaced.html  ">  Lots   of
+        whitespace  </a>
+    <a>No href</a>
+    <a href="">Empty href</a>
+    <a href="nested.html"><span>Nested <b>bold</b></span> tail</a>
+    <a href="styled.html">Styled<style>.x{}</style> text</a>
+  </nav>
+  <template><a href="templated.html">In template</a></template>
+  <p>Text <a href="intro.html">repeated link</a> after</p>
+  <a href="mailto:someone@example.com">Mail</a>
+</body>
+</html>
+"""
+
+
+def reference(content, base_url=""):
+    return extract_links(content, base_url, parser="bs4")
+
+
+@pytest.mark.parametrize("parser", FAST_PARSERS)
+def test_matches_bs4_on_string(parser):
+    assert extract_links(DOCUMENT, parser=parser) == reference(DOCUMENT)
+
+
+@pytest.mark.parametrize("parser", FAST_PARSERS)
+def test_matches_bs4_on_bytes(parser):
+    assert extract_links(DOCUMENT.encode("utf-8"), parser=parser) == reference(DOCUMENT)
+
+
+def test_reference_output():
+    lines, relative, base_url = reference(DOCUMENT, "https://ignored.example.com/")
+    assert base_url == "https://docs.example.com/guide/"   # <base href> wins
+    assert lines[0] == "- [Root page](https://docs.example.com/root)"
+    assert lines[1] == "- [Intro](https://docs.example.com/guide/intro.html)"
+    assert lines[2] == "- [API & reference \u2014 caf\xe9 \u263a](https://docs.example.com/api/#section)"
+    assert "- [In template](https://docs.example.com/guide/templated.html)" not in lines
+    assert not any("not-a-link" in line or "script text" in line for line in lines)
+    assert "/root" in relative and "/guide/intro.html" in relative
+    assert not any("other.example.org" in r for r in relative)
+
+
+@pytest.mark.parametrize("parser", FAST_PARSERS)
+def test_base_url_without_base_tag(parser):
+    doc = DOCUMENT.replace('<base href="https://docs.example.com/guide/">', "")
+    base_url = "https://site.example.com/a/b.html"
+    assert extract_links(doc, base_url, parser=parser) == reference(doc, base_url)
+
+
+@pytest.mark.parametrize("parser", FAST_PARSERS)
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+def test_matches_bs4_across_chunk_boundaries(tmp_path, monkeypatch, parser, chunk_size):
+    # Tiny chunks split tags, entities and multi-byte UTF-8 characters
+    path = tmp_path / "export.html"
+    path.write_text(DOCUMENT, encoding="utf-8")
+    monkeypatch.setattr(htmlscraper, "CHUNK_SIZE", chunk_size)
+    assert extract_links_from_file(path, parser=parser) == reference(DOCUMENT)
+
+
+@pytest.mark.parametrize("parser", FAST_PARSERS)
+def test_anchor_spanning_mmap_chunk(tmp_path, parser):
+    # One anchor (with a multi-byte character) straddles the first 1 MB chunk of the mapped file
+    head = "<html><body><div>"
+    anchor = '<a href="/spanning">Spanning café anchor</a>'
+    split_at = htmlscraper.CHUNK_SIZE - len(head.encode("utf-8")) - anchor.index("café") - 4
+    padding = "<p>" + "x" * (split_at - 7) + "</p>"
+    doc = head + padding + anchor + DOCUMENT + "</div></body></html>"
+    data = doc.encode("utf-8")
+    start = data.index(b'<a href="/spanning"')
+    assert start < htmlscraper.CHUNK_SIZE < start + len(anchor.encode("utf-8"))
+
+    path = tmp_path / "big.html"
+    path.write_bytes(data)
+    result = extract_links_from_file(path, parser=parser)
+    assert result == reference(doc)
+    assert "- [Spanning café anchor](https://docs.example.com/spanning)" in result[0]
+
+
+def test_empty_document():
+    for parser in ["bs4"] + FAST_PARSERS:
+        assert extract_links("", parser=parser) == ([], [], "")
+
+
+def test_check_parsers_reports_matches():
+    report = check_parsers(DOCUMENT)
+    assert set(report) == {"bs4", "lxml", "stream"}
+    assert all(r["matches"] and r["first_difference"] is None for r in report.values())
+
+
+def test_unknown_parser():
+    with pytest.raises(ValueError):
+        extract_links(DOCUMENT, parser="html5lib")
@@ -0,0 +1,76 @@
+"""
+HTTPCache disk format: entries are raw bodies plus JSON sidecars, never
+pickles, and revalidation/eviction work on both files of an entry.
+"""
+import json
+import os
+
+import pytest
+
+from harspylib.xlinkscraper.xlinkcache import HTTPCache, conditional_headers
+
+URL = "https://example.com/page"
+BODY = "<html><body><a href='/x'>caf\xe9</a></body></html>".encode("utf-8")
+
+
+def entry_files(directory):
+    return sorted(os.path.splitext(name)[1] for name in os.listdir(directory))
+
+
+def store(cache, url=URL, headers=None):
+    return cache.update(url, 200, headers or {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+                        BODY, final_url=url + "?final", encoding="utf-8")
+
+
+def test_entry_is_body_plus_json_sidecar(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    store(cache)
+    assert entry_files(tmp_path) == [".body", ".json"]
+    sidecar = next(p for p in tmp_path.iterdir() if p.suffix == ".json")
+    meta = json.loads(sidecar.read_text(encoding="utf-8"))
+    assert meta["url"] == URL
+    assert meta["status"] == 200
+    assert meta["etag"] == '"v1"'
+    assert next(p for p in tmp_path.iterdir() if p.suffix == ".body").read_bytes() == BODY
+
+
+def test_offline_lookup_round_trips(tmp_path):
+    store(HTTPCache(str(tmp_path)))
+    page, fresh = HTTPCache(str(tmp_path), offline=True).lookup(URL)
+    assert fresh
+    assert page.content == BODY
+    assert page.text == "<html><body><a href='/x'>caf\xe9</a></body></html>"
+    assert page.final_url == URL + "?final"
+    assert conditional_headers(page) == {"If-None-Match": '"v1"',
+                                         "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    with pytest.raises(LookupError):
+        HTTPCache(str(tmp_path), offline=True).lookup(URL + "/missing")
+
+
+def test_revalidation_keeps_body_and_updates_validators(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    stale = store(cache)
+    page = cache.update(URL, 304, {"ETag": '"v2"'}, stale=stale)
+    assert page.content == BODY
+    reloaded, fresh = cache.lookup(URL)
+    assert not fresh
+    assert reloaded.etag == '"v2"'
+    assert reloaded.content == BODY
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_corrupt_sidecar_is_a_miss(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    store(cache)
+    next(p for p in tmp_path.iterdir() if p.suffix == ".json").write_text("{not json", encoding="utf-8")
+    assert cache.lookup(URL) == (None, False)
+
+
+def test_trim_evicts_both_files_of_an_entry(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    for i in range(3):
+        store(cache, url=f"{URL}/{i}")
+    cache.max_bytes = 1
+    cache.trim()
+    assert os.listdir(tmp_path) == []
+    assert cache.stats()["evictions"] == 3
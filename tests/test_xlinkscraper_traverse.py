@@ -0,0 +1,211 @@
+"""
+recursive_traverse against HARVEST_SCRIPT without a browser: the script runs
+in node over a small mock DOM, and a fake driver forwards execute_script and
+clicks to it. Skipped when node is not installed.
+"""
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from harspylib.xlinkscraper import xlinkscraper
+from harspylib.xlinkscraper.xlinkscraper import HARVEST_SCRIPT, recursive_traverse
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+
+# Mock DOM plus a line-based protocol: each request is a JSON line, each
+# element crossing the boundary is replaced by {"handle": n}.
+PAGE = r"""
+const readline = require("readline");
+class El {
+    constructor(tag, attrs, children) {
+        this.nodeType = 1;
+        this.tagName = tag.toUpperCase();
+        this.attrs = attrs || {};
+        this.children = [];
+        this.parentElement = null;
+        this.label = "";
+        for (const c of children || []) this.append(c);
+    }
+    append(c) {
+        if (typeof c === "string") this.label += c;
+        else { c.remove(); c.parentElement = this; this.children.push(c); }
+        return this;
+    }
+    insertBefore(c, ref) {
+        c.remove();
+        c.parentElement = this;
+        this.children.splice(this.children.indexOf(ref), 0, c);
+    }
+    replaceWith(c) {
+        const parent = this.parentElement;
+        parent.insertBefore(c, this);
+        this.remove();
+    }
+    remove() {
+        if (this.parentElement) this.parentElement.children.splice(this.parentElement.children.indexOf(this), 1);
+        this.parentElement = null;
+    }
+    get previousElementSibling() {
+        if (!this.parentElement) return null;
+        const sibs = this.parentElement.children;
+        return sibs[sibs.indexOf(this) - 1] || null;
+    }
+    get textContent() { return this.label + this.children.map(c => c.textContent).join(""); }
+    get innerText() { return this.textContent; }
+    get isConnected() {
+        let node = this;
+        while (node.parentElement) node = node.parentElement;
+        return node === document.body;
+    }
+    get href() { return "https://example.com" + this.attrs.href; }
+    getAttribute(name) { return name in this.attrs ? this.attrs[name] : null; }
+    getClientRects() { return [{}]; }
+    getElementsByTagName(tag) {
+        const out = [];
+        const walk = el => {
+            for (const c of el.children) {
+                if (c.tagName === tag.toUpperCase()) out.push(c);
+                walk(c);
+            }
+        };
+        walk(this);
+        return out;
+    }
+    click() { this.clicks = (this.clicks || 0) + 1; if (this.onclick) this.onclick(); }
+}
+const el = (tag, attrs, ...children) => new El(tag, attrs, children);
+global.window = global;
+global.document = {body: el("body")};
+
+const late = el("a", {}, "Late");
+const nav = el("div", {id: "nav"}, el("a", {href: "/top"}, "Top"), late);
+document.body.append(nav);
+
+// A toggle whose label changes and that inserts a sibling before itself
+const toggle = el("button", {}, "Show more");
+nav.append(toggle);
+let section = null;
+toggle.onclick = () => {
+    if (section) {
+        section.remove();
+        section = null;
+        toggle.label = "Show more";
+        return;
+    }
+    const details = el("button", {}, "Details");
+    section = el("div", {}, el("a", {href: "/a"}, "A"), details);
+    details.onclick = () => section.append(el("a", {href: "/b"}, "B"));
+    nav.append(section);
+    nav.insertBefore(el("button", {}, "Extra"), toggle);
+    late.attrs.href = "/late";   // client-side nav filled in after the first harvest
+    toggle.label = "Show less";
+};
+
+// A button the page re-renders as a new node in the same place on every click
+const renders = {count: 0};
+function reloader() {
+    const b = el("button", {}, "Reload");
+    b.onclick = () => { renders.count++; b.replaceWith(reloader()); };
+    return b;
+}
+nav.append(reloader());
+
+const handles = new Map(), elements = [];
+function encode(value) {
+    if (value instanceof El) {
+        if (!handles.has(value)) { handles.set(value, elements.length); elements.push(value); }
+        return {handle: handles.get(value)};
+    }
+    return Array.isArray(value) ? value.map(encode) : value;
+}
+const decode = value => value && typeof value === "object" && "handle" in value ? elements[value.handle] : value;
+
+const rl = readline.createInterface({input: process.stdin});
+rl.on("line", line => {
+    const req = JSON.parse(line);
+    let result = null;
+    if (req.op === "script") result = new Function(req.script)(...req.args.map(decode));
+    else if (req.op === "click") decode(req.element).click();
+    else if (req.op === "nav") result = nav;
+    else if (req.op === "clicks") result = {toggle: toggle.clicks || 0, renders: renders.count};
+    process.stdout.write(JSON.stringify(encode(result)) + "\n");
+});
+"""
+
+
+class NodeElement:
+    def __init__(self, page, handle):
+        self.parent = page
+        self.handle = handle
+
+    def click(self):
+        self.parent.call(op="click", element={"handle": self.handle})
+
+
+class NodePage:
+    """Fake WebDriver backed by the node page; settle waits return at once."""
+
+    def __init__(self):
+        self.proc = subprocess.Popen(["node", "-e", PAGE], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     text=True)
+
+    def call(self, **request):
+        self.proc.stdin.write(json.dumps(request) + "\n")
+        self.proc.stdin.flush()
+        return self._wrap(json.loads(self.proc.stdout.readline()))
+
+    def _wrap(self, value):
+        if isinstance(value, dict) and "handle" in value:
+            return NodeElement(self, value["handle"])
+        if isinstance(value, list):
+            return [self._wrap(v) for v in value]
+        return value
+
+    def execute_script(self, script, *args):
+        if script != HARVEST_SCRIPT:
+            return None   # scrollIntoView
+        args = [{"handle": a.handle} if isinstance(a, NodeElement) else a for a in args]
+        return self.call(op="script", script=script, args=args)
+
+    def execute_async_script(self, script, *args):
+        return True
+
+    def find_element(self, by, xpath):
+        return self.call(op="nav")
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+@pytest.fixture
+def page():
+    page = NodePage()
+    yield page
+    page.close()
+
+
+def traverse(page, monkeypatch):
+    monkeypatch.setattr(xlinkscraper, "wait_for_settle", lambda *args: True)
+    links, visited = [], set()
+    recursive_traverse(page, page.call(op="nav"), "https://example.com/", links, visited,
+                       maxdepth=None, click_xpath=None, scope_xpath="//div[@id='nav']")
+    return [resolved for _, resolved, _ in links]
+
+
+def test_toggle_with_changing_label_is_clicked_once(page, monkeypatch):
+    links = traverse(page, monkeypatch)
+    assert page.call(op="clicks")["toggle"] == 1
+    assert [link for link in links if not link.endswith("/late")] == [
+        "https://example.com/top", "https://example.com/a", "https://example.com/b"]
+
+
+def test_anchor_given_an_href_later_is_collected(page, monkeypatch):
+    assert traverse(page, monkeypatch).count("https://example.com/late") == 1
+
+
+def test_rerendered_element_keeps_its_key(page, monkeypatch):
+    traverse(page, monkeypatch)
+    assert page.call(op="clicks")["renders"] == 1